@@ -33,14 +33,16 @@ done
 for ddgapp in lockctrl lockctrl_alt
 do
   ./Z_templateGen_ddg.sh ${ddgapp}
-  seq -w 0 5 | while read i
+  ## Only representative DDG permutations are generated (see ${ddgapp}.manifest)
+  ddgidx=$(ls Z_${ddgapp}_TEMPLATE/*.ddg | xargs -n 1 basename | sed "s/^${ddgapp}//;s/\.ddg$//")
+  for i in ${ddgidx}
   do
     rm -rf ZZ_${ddgapp}${i}
     cp -R Z_${ddgapp}_TEMPLATE ZZ_${ddgapp}${i}
   done
   rm -rf Z_${ddgapp}_TEMPLATE
   
-  seq -w 0 5 | while read i
+  for i in ${ddgidx}
   do
     ./ZZ_ddg2code.sh ${ddgapp}${i}
     ./ZZ_code2images.sh ${ddgapp}${i}
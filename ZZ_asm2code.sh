@@ -11,12 +11,7 @@ set -e
 
 echo "== ASM2CODE START == $(date) =="
 
-for di in $(ls -d ZZ_$1*/)
-do
-  echo $di
-  { echo "== START == $(date) ==" > $di$1.log; { cd $di; ./asm2ddg.py $1.asm | ./ddg2sets.py | ./sets2slack2cover.py | ./cover2code.py; cd ..; } 1> $di$1.code 2>> $di$1.log; echo "== END == $(date) ==" >> $di$1.log; } &
-done
-
-wait
+ls -d ZZ_$1*/
+./tools_alldep/ddgs2codes.py $(ls -d ZZ_$1*/ | sed "s/$/$1.asm/")
 
 echo "== ASM2CODE END == $(date) =="
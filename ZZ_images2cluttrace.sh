@@ -16,24 +16,25 @@ do
   ### Generate images2cluttrace.sh
   echo "#!/bin/bash" > ${di}images2cluttrace.sh
   echo "set -e" >> ${di}images2cluttrace.sh
+  echo "set -o pipefail" >> ${di}images2cluttrace.sh
   echo "" >> ${di}images2cluttrace.sh
   echo "for f in $1/*.inc" >> ${di}images2cluttrace.sh
   echo "do" >> ${di}images2cluttrace.sh
   echo "  cover=\$(basename \$f .inc)" >> ${di}images2cluttrace.sh
   echo "  " >> ${di}images2cluttrace.sh
-  echo "  for g in $1/\$cover.*.mem" >> ${di}images2cluttrace.sh
+  echo "  for g in \$(./imagearchive.py $1 list \"\$cover.*.mem\")" >> ${di}images2cluttrace.sh
   echo "  do" >> ${di}images2cluttrace.sh
   echo "    img=\$(basename \$g .mem)" >> ${di}images2cluttrace.sh
   echo "    " >> ${di}images2cluttrace.sh
-  echo "    for h in $1/\$img.*.schg" >> ${di}images2cluttrace.sh
+  echo "    for h in \$(./imagearchive.py $1 list \"\$img.*.schg\")" >> ${di}images2cluttrace.sh
   echo "    do" >> ${di}images2cluttrace.sh
   echo "      cl=\$(basename \$h .schg)" >> ${di}images2cluttrace.sh
-  echo "      cat \$g | ./asm2cycles.py $1/\$img.asm $1.bbtrace \$h $1/\$cover.incdef | ./cycles2cluttrace.py > $1/\$cl.cluttrace" >> ${di}images2cluttrace.sh
+  echo "      echo \"\$g $1/\$img.asm $1.bbtrace \$h $1/\$cover.incdef $1/\$cl.cluttrace\"" >> ${di}images2cluttrace.sh
   echo "    done" >> ${di}images2cluttrace.sh
   echo "    " >> ${di}images2cluttrace.sh
   echo "  done" >> ${di}images2cluttrace.sh
   echo "  " >> ${di}images2cluttrace.sh
-  echo "done" >> ${di}images2cluttrace.sh
+  echo "done | ./asm2cycles.py $1 -" >> ${di}images2cluttrace.sh
   
   chmod ugo+x ${di}images2cluttrace.sh
   
@@ -22,10 +22,11 @@ do
   echo "do" >> ${di}images2openc.sh
   echo "  cover=\$(basename \$f .inc)" >> ${di}images2openc.sh
   echo "  " >> ${di}images2openc.sh
-  echo "  for g in $1/\$cover.*.mem" >> ${di}images2openc.sh
+  echo "  for g in \$(./imagearchive.py $1 list \"\$cover.*.mem\")" >> ${di}images2openc.sh
   echo "  do" >> ${di}images2openc.sh
   echo "    img=\$(basename \$g .mem)" >> ${di}images2openc.sh
-  echo "    cat \$g | ./asm2cycles.py $1/\$img.asm $1.bbtrace $1/\$img.+(0).schg $1/\$cover.incdef | ./cycles2openc.py \$img" >> ${di}images2openc.sh
+  echo "    h=\$(./imagearchive.py $1 list \"\$img.*.schg\" | grep -E '\\.0+\\.schg\$')" >> ${di}images2openc.sh
+  echo "    ./imagearchive.py $1 cat \$g | ./asm2cycles.py $1/\$img.asm $1.bbtrace <(./imagearchive.py $1 cat \$h) $1/\$cover.incdef | ./cycles2openc.py \$img" >> ${di}images2openc.sh
   echo "  done" >> ${di}images2openc.sh
   echo "  " >> ${di}images2openc.sh
   echo "done" >> ${di}images2openc.sh
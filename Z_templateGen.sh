@@ -22,7 +22,10 @@ cp asm/soloasm.* $outdir
 cp asm/solo*.awk $outdir
 
 cp tools_alldep/asm2cycles.py $outdir
+cp tools_alldep/asm2mem.py $outdir
 cp tools_alldep/asm2ddg.py $outdir
+cp tools_alldep/blockstore.py $outdir
+cp tools_alldep/checkpoint.py $outdir
 cp tools_alldep/code2asm.py $outdir
 cp tools_alldep/code2streams.py $outdir
 cp tools_alldep/config.py $outdir
@@ -32,6 +35,7 @@ cp tools_alldep/cycles2cluttrace.py $outdir
 cp tools_alldep/cycles2openc.py $outdir
 cp tools_alldep/ddg2sets.py $outdir
 cp tools_alldep/func_match.py $outdir
+cp tools_alldep/imagearchive.py $outdir
 cp tools_alldep/sets2slack2cover.py $outdir
 
 mkdir -p $outdir/sim
@@ -44,6 +48,7 @@ cp tools_alldep/sim/Makefile $outdir/sim
 ### Generate code2images.sh
 echo "#!/bin/bash" > $outdir/code2images.sh
 echo "set -e" >> $outdir/code2images.sh
+echo "set -o pipefail" >> $outdir/code2images.sh
 echo "" >> $outdir/code2images.sh
 echo "rm -rf $1/" >> $outdir/code2images.sh
 echo "cat $1.code | ./code2asm.py $1" >> $outdir/code2images.sh
@@ -53,21 +58,13 @@ echo "for f in $1/*.incdef" >> $outdir/code2images.sh
 echo "do" >> $outdir/code2images.sh
 echo "  cover=\$(basename \$f .incdef)" >> $outdir/code2images.sh
 echo "  cat nano.template.header.inc $1/\$cover.incdef nano.template.footer.inc > $1/\$cover.inc" >> $outdir/code2images.sh
-echo "  cp $1/\$cover.inc ." >> $outdir/code2images.sh
-echo "  " >> $outdir/code2images.sh
-echo "  for g in $1/\$cover.*.asm" >> $outdir/code2images.sh
-echo "  do" >> $outdir/code2images.sh
-echo "    img=\$(basename \$g .asm)" >> $outdir/code2images.sh
-echo "    ./axasm -p \$cover -v \$g > $1/\$img.mem" >> $outdir/code2images.sh
-echo "  done" >> $outdir/code2images.sh
-echo "  " >> $outdir/code2images.sh
-echo "  rm \$cover.inc" >> $outdir/code2images.sh
-echo "  " >> $outdir/code2images.sh
 echo "done" >> $outdir/code2images.sh
 echo "" >> $outdir/code2images.sh
+echo "./asm2mem.py $1 nano.template.header.inc" >> $outdir/code2images.sh
+echo "" >> $outdir/code2images.sh
 echo "### Golden Reference" >> $outdir/code2images.sh
-echo "cp ../sim/img/$1.mem $1/goldenref.mem" >> $outdir/code2images.sh
-echo "cp ../sim/img/$1.clut $1/goldenref.clut" >> $outdir/code2images.sh
-echo "cp ../sim/img/$1.schg $1/goldenref.schg" >> $outdir/code2images.sh
+echo "./imagearchive.py $1 add goldenref.mem < ../sim/img/$1.mem" >> $outdir/code2images.sh
+echo "./imagearchive.py $1 add goldenref.clut < ../sim/img/$1.clut" >> $outdir/code2images.sh
+echo "./imagearchive.py $1 add goldenref.schg < ../sim/img/$1.schg" >> $outdir/code2images.sh
 
 chmod ugo+x $outdir/code2images.sh
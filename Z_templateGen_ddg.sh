@@ -19,6 +19,9 @@ do
   mv $f $outdir
   cp sw/$1.ast.bbtrace $outdir/$ddgname.bbtrace
 done
+if [ -f $1.manifest ]; then
+  mv $1.manifest $outdir
+fi
 
 cp asm/axasm $outdir
 cp asm/nano*.inc $outdir
@@ -26,6 +29,9 @@ cp asm/soloasm.* $outdir
 cp asm/solo*.awk $outdir
 
 cp tools_alldep/asm2cycles.py $outdir
+cp tools_alldep/asm2mem.py $outdir
+cp tools_alldep/blockstore.py $outdir
+cp tools_alldep/checkpoint.py $outdir
 cp tools_alldep/code2asm.py $outdir
 cp tools_alldep/code2streams.py $outdir
 cp tools_alldep/config.py $outdir
@@ -35,6 +41,7 @@ cp tools_alldep/cycles2cluttrace.py $outdir
 cp tools_alldep/cycles2openc.py $outdir
 cp tools_alldep/ddg2sets.py $outdir
 cp tools_alldep/func_match.py $outdir
+cp tools_alldep/imagearchive.py $outdir
 cp tools_alldep/sets2slack2cover.py $outdir
 
 mkdir -p $outdir/sim
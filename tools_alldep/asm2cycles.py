@@ -7,11 +7,21 @@
 ## license that can be found in the LICENSE file or at
 ## https://opensource.org/licenses/MIT.
 
+## Cycle lists of a NanoController program (IMEM image via stdin, ASM source, basic block trace, State Change LUT,
+## INCDEF) for cycles2cluttrace.py and cycles2openc.py. Batch mode reads a manifest (file or '-' for stdin) with one
+## '<img>.mem <img>.asm <app>.bbtrace <img>.<lut>.schg <cover>.incdef <img>.<lut>.cluttrace' line per pair (images
+## by name in output directory, see imagearchive.py), parses every distinct input once and writes all Cycle LUT traces:
+##   asm2cycles.py <file.asm> [<bbtrace> [<schg> [<incdef>]]]   print cycle lists of IMEM image read from stdin
+##   asm2cycles.py <outdir> <manifest>                          write .cluttrace files listed in manifest
+
 import re
+import os
 import sys
 import tempfile
 import ast
 import config as cf
+import imagearchive
+import cycles2cluttrace
 
 # Standard ISA (can be overridden by INCDEF file below)
 incdef = [ \
@@ -61,43 +71,30 @@ bbTrace = []
 
 ##################################
 
-argc = len(sys.argv)
-if argc > 4:
-  incdef = []
-  with open(sys.argv[4]) as fIncDef:
-    for line in fIncDef:
-      incdef.append(line)
-if argc > 3:
-  schgLUT = []
-  with open(sys.argv[3]) as fSchgLUT:
-    for line in fSchgLUT:
-      if line[0] != '@':
-        schgLUT.append(line)
-if argc > 2:
-  with open(sys.argv[2]) as fBbTrace:
-    bbTrace = ast.literal_eval(fBbTrace.read())
-
-f = open(sys.argv[1])
-
-g = tempfile.TemporaryFile('w+')
-g.write(sys.stdin.read())
-g.seek(0)
-
-
-iMemCode = []
-for line in g:                                                          # Pass 0: Read Verilog memory object input from axasm via stdin and arrange as integer list
-  for i in line.split():
-    if i[0] != '@':
-      iMemCode.extend(i)
-iMemCode = [int(i, 16) for i in iMemCode]
-
 reToken = re.compile(r'\s*#define\s+(\w+)(\([\.\w]+\)\s+|\s+)DB\((\d+)\)')
-tokenDict = {}
-for line in incdef:                                                     # Pass 1: Read INCDEF file and obtain valid mnemonic tokens, correlate with state change LUT data
-  matchToken = reToken.match(line)
-  if matchToken:                                                        # yep, it's a valid mnemonic token, so:
-    mnemo = matchToken.group(1)
-    opEnc = int(matchToken.group(3))                                    # - get integer representation of opcode encoding, store it in token dictionary
+
+def readMemCode(lines):                                                 # Pass 0: Read Verilog memory object and arrange as integer list
+  iMemCode = []
+  for line in lines:
+    for i in line.split():
+      if i[0] != '@':
+        iMemCode.extend(i)
+  return [int(i, 16) for i in iMemCode]
+
+def readSchgLUT(lines):                                                 # Auxiliary Function: State Change LUT entries without address lines
+  return [line for line in lines if line[0] != '@']
+
+def readOpcodes(incdef):                                                # Pass 1a: Read INCDEF file and obtain valid mnemonic tokens with integer opcode encodings
+  opcodes = []
+  for line in incdef:
+    matchToken = reToken.match(line)
+    if matchToken:                                                      # yep, it's a valid mnemonic token
+      opcodes.append((matchToken.group(1), int(matchToken.group(3))))
+  return opcodes
+
+def decodeTokens(opcodes,schgLUT):                                      # Pass 1b: Correlate mnemonic tokens with state change LUT data
+  tokenDict = {}
+  for mnemo, opEnc in opcodes:
     tokenDict[mnemo] = {}
     tokenDict[mnemo]['opcode'] = opEnc
     schgEntry = schgLUT[opEnc]                                          # - use opcode encoding to retrieve information from state change LUT
@@ -108,58 +105,133 @@ for line in incdef:                                                     # Pass 1
       idxR = min(idxR,len(schgEntry))
       tokenDict[mnemo][field] = int(schgEntry[:idxR], 2)
       schgEntry = schgEntry[idxR:]
-
-if cf.debugStdErr:
-  print(tokenDict, file=sys.stderr)
-  print(file=sys.stderr)
-
-iMemPerBB = []
-cLutPerBB = []
-xtraPerBB = []
-injectBB = False
-iMemPtr = 0
-for line in f:                                                          # Pass 2: Read ASM source file line by line
-  tokens = line.split(';')[0].strip().split()                           # Tokenize input line, separated by whitespaces
-  if len(tokens) == 0:
-    continue                                                            # if tokens empty, continue with next line
-  token = tokens[0]
-  if token == 'END':                                                    # Abortion if END of source file found
-    break
-  if injectBB or token[-1] == ':' or token == 'ORG':                    # Special cases of new basic blocks: If BB injection marked, or token is 'ORG' or ends with ':' being a label
-    iMemPerBB.append([])
-    cLutPerBB.append([])
-    xtraPerBB.append([])
-    if cf.debugStdErr:
-      print(f"=== New BB ===", file=sys.stderr)
-    injectBB = False
-  if token in tokenDict:                                                # if Trivial case: token found in token dictionary, add up cycles
-    if tokenDict[token]['Branch'] == 1 \
-    or tokenDict[token]['Wake'] == 1:                                   # - mark injection of new basic block after control flow instruction
-      injectBB = True
-    iMemPerBB[-1].append([token])                                       # FETCH + REGFETCH cycles
-    iMemPerBB[-1][-1].extend(iMemCode[iMemPtr+1:iMemPtr+len(tokens)])
-    iMemPtr += len(tokens)
-    if len(tokens) > 1:
-      xtraPerBB[-1].append(token)                                       # xtra FETCH cycle when REGFETCH follows
-    cLutPerBB[-1].append(list(range(tokenDict[token]['BaseAddr'], \
-    tokenDict[token]['BaseAddr']+tokenDict[token]['Cycode']+1)))        # EXECUTE cycles
-    if tokenDict[token]['Branch'] == 1:
-      xtraPerBB[-1].append(token)                                       # xtra EXECUTE cycle when a branch instruction
-  else:
-    continue
-  print(f"{tokens} +++ {'2' if len(tokens) > 1 else '1'} FETCH {f'+++ {len(tokens)-1} REGFETCH' if len(tokens) > 1 else ''} +++ {tokenDict[token]['Cycode']+tokenDict[token]['Branch']+1} EXECUTE", file=sys.stderr)
-f.close()
-
-iMemCycleList = []
-cLutCycleList = []
-xtraCycleList = []
-for i in bbTrace:                                                       # Pass 3: Accumulate cycle lists according to program basic block trace to obtain profiling for complete application
-  iMemCycleList.extend(iMemPerBB[i])
-  cLutCycleList.extend(cLutPerBB[i])
-  xtraCycleList.extend(xtraPerBB[i])
-
-if cf.debugStdErr:
-  print(file=sys.stderr)
-  print([sum([len(ii) for ii in i])+sum([len(jj) for jj in j])+len(k) for i,j,k in zip(iMemPerBB, cLutPerBB, xtraPerBB)], file=sys.stderr)
-
-print(repr((iMemCycleList, cLutCycleList, xtraCycleList)))
+  return tokenDict
+
+def readAsm(lines):                                                     # Pass 2a: Tokenize ASM source file line by line up to END (comments and empty lines dropped)
+  statements = []
+  for line in lines:
+    tokens = line.split(';')[0].strip().split()                         # Tokenize input line, separated by whitespaces
+    if len(tokens) == 0:
+      continue                                                          # if tokens empty, continue with next line
+    if tokens[0] == 'END':                                              # Abortion if END of source file found
+      break
+    statements.append(tokens)
+  return statements
+
+def cyclesPerBB(statements,tokenDict,iMemCode,log=True):                # Pass 2b: Cycles of instructions per basic block (log: print cycles of every instruction)
+  iMemPerBB = []
+  cLutPerBB = []
+  xtraPerBB = []
+  injectBB = False
+  iMemPtr = 0
+  for tokens in statements:
+    token = tokens[0]
+    if injectBB or token[-1] == ':' or token == 'ORG':                  # Special cases of new basic blocks: If BB injection marked, or token is 'ORG' or ends with ':' being a label
+      iMemPerBB.append([])
+      cLutPerBB.append([])
+      xtraPerBB.append([])
+      if log and cf.debugStdErr:
+        print(f"=== New BB ===", file=sys.stderr)
+      injectBB = False
+    if token in tokenDict:                                              # if Trivial case: token found in token dictionary, add up cycles
+      if tokenDict[token]['Branch'] == 1 \
+      or tokenDict[token]['Wake'] == 1:                                 # - mark injection of new basic block after control flow instruction
+        injectBB = True
+      iMemPerBB[-1].append([token])                                     # FETCH + REGFETCH cycles
+      iMemPerBB[-1][-1].extend(iMemCode[iMemPtr+1:iMemPtr+len(tokens)])
+      iMemPtr += len(tokens)
+      if len(tokens) > 1:
+        xtraPerBB[-1].append(token)                                     # xtra FETCH cycle when REGFETCH follows
+      cLutPerBB[-1].append(list(range(tokenDict[token]['BaseAddr'], \
+      tokenDict[token]['BaseAddr']+tokenDict[token]['Cycode']+1)))      # EXECUTE cycles
+      if tokenDict[token]['Branch'] == 1:
+        xtraPerBB[-1].append(token)                                     # xtra EXECUTE cycle when a branch instruction
+    else:
+      continue
+    if log:
+      print(f"{tokens} +++ {'2' if len(tokens) > 1 else '1'} FETCH {f'+++ {len(tokens)-1} REGFETCH' if len(tokens) > 1 else ''} +++ {tokenDict[token]['Cycode']+tokenDict[token]['Branch']+1} EXECUTE", file=sys.stderr)
+  return iMemPerBB, cLutPerBB, xtraPerBB
+
+def cycleLists(iMemPerBB,cLutPerBB,xtraPerBB,bbTrace):                  # Pass 3: Accumulate cycle lists according to program basic block trace to obtain profiling for complete application
+  iMemCycleList = []
+  cLutCycleList = []
+  xtraCycleList = []
+  for i in bbTrace:
+    iMemCycleList.extend(iMemPerBB[i])
+    cLutCycleList.extend(cLutPerBB[i])
+    xtraCycleList.extend(xtraPerBB[i])
+  return iMemCycleList, cLutCycleList, xtraCycleList
+
+def runBatch(outdir,manifest):                                          # Write Cycle LUT traces of all pairs in manifest, every distinct input parsed once
+  parsed = {}
+  def cached(kind,key,parse):                                           # Auxiliary Function: Parse input once per kind and key
+    if (kind,key) not in parsed:
+      parsed[(kind,key)] = parse()
+    return parsed[(kind,key)]
+  def readFile(path):                                                   # Auxiliary Function: Lines of a file
+    with open(path) as f:
+      return f.readlines()
+  count = 0
+  for line in manifest:
+    if len(line.split()) == 0:
+      continue
+    mem, asm, bbtrace, schg, incdef, cluttrace = line.split()
+    iMemCode = cached('mem', mem, lambda: readMemCode(imagearchive.read(outdir,mem).splitlines()))
+    statements = cached('asm', asm, lambda: readAsm(readFile(asm)))
+    trace = cached('bbtrace', bbtrace, lambda: ast.literal_eval(''.join(readFile(bbtrace))))
+    schgLUT = cached('schg', schg, lambda: readSchgLUT(imagearchive.read(outdir,schg).splitlines(True)))
+    opcodes = cached('incdef', incdef, lambda: readOpcodes(readFile(incdef)))
+    tokenDict = cached('tokens', (incdef,tuple(schgLUT)), lambda: decodeTokens(opcodes,schgLUT))
+    iMemPerBB, cLutPerBB, _ = cyclesPerBB(statements,tokenDict,iMemCode,log=False)
+    nonEmpty = tuple(len(cLut) > 0 for cLut in cLutPerBB)
+    transitions = cached('transitions', (bbtrace,nonEmpty), lambda: cycles2cluttrace.bbTransitions(trace,nonEmpty))
+    with open(cluttrace, 'w') as f:
+      print(cycles2cluttrace.hammingBBTrace(iMemPerBB,cLutPerBB,trace,transitions), file=f)
+    count += 1
+  imagearchive.close(outdir)
+  if cf.debugStdErr:
+    kinds = [kind for kind, _ in parsed]
+    print(f'[CYCLES] {count} Cycle LUT traces from {kinds.count("mem")} IMEM images, {kinds.count("schg")} State Change LUTs, {kinds.count("asm")} ASM sources and {kinds.count("incdef")} INCDEF files.', file=sys.stderr)
+
+
+if __name__ == '__main__':
+  if os.path.isdir(sys.argv[1]):
+    if sys.argv[2] == '-':
+      runBatch(sys.argv[1], sys.stdin)
+    else:
+      with open(sys.argv[2]) as fManifest:
+        runBatch(sys.argv[1], fManifest)
+    sys.exit()
+
+  argc = len(sys.argv)
+  if argc > 4:
+    with open(sys.argv[4]) as fIncDef:
+      incdef = fIncDef.readlines()
+  if argc > 3:
+    with open(sys.argv[3]) as fSchgLUT:
+      schgLUT = readSchgLUT(fSchgLUT)
+  if argc > 2:
+    with open(sys.argv[2]) as fBbTrace:
+      bbTrace = ast.literal_eval(fBbTrace.read())
+
+  f = open(sys.argv[1])
+
+  g = tempfile.TemporaryFile('w+')
+  g.write(sys.stdin.read())
+  g.seek(0)
+
+  iMemCode = readMemCode(g)                                             # Read Verilog memory object input from axasm via stdin
+  tokenDict = decodeTokens(readOpcodes(incdef),schgLUT)
+
+  if cf.debugStdErr:
+    print(tokenDict, file=sys.stderr)
+    print(file=sys.stderr)
+
+  iMemPerBB, cLutPerBB, xtraPerBB = cyclesPerBB(readAsm(f),tokenDict,iMemCode)
+  f.close()
+
+  if cf.debugStdErr:
+    print(file=sys.stderr)
+    print([sum([len(ii) for ii in i])+sum([len(jj) for jj in j])+len(k) for i,j,k in zip(iMemPerBB, cLutPerBB, xtraPerBB)], file=sys.stderr)
+
+  print(repr(cycleLists(iMemPerBB,cLutPerBB,xtraPerBB,bbTrace)))
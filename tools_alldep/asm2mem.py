@@ -0,0 +1,273 @@
+#!/bin/python3
+## Copyright (c) 2025 Chair for Chip Design for Embedded Computing,
+##                    TU Braunschweig, Germany
+##                    www.tu-braunschweig.de/en/eis
+##
+## Use of this source code is governed by an MIT-style
+## license that can be found in the LICENSE file or at
+## https://opensource.org/licenses/MIT.
+
+## In-process replacement of 'axasm -p <processor> -v' for NanoController programs: expands the processor
+## macros (ARG/BRANCH immediates, DMASK nibble width, PAT_nn or mnemonic definitions) like the C preprocessor,
+## assembles in two passes like soloasm and prints the Verilog memory image with two nibbles per byte.
+##   asm2mem.py <processor.inc> <file.asm>         print image of a single program (e.g., nano.inc)
+##   asm2mem.py <outdir> <header.inc>              assemble all <outdir>/<cover>.*.asm with <outdir>/<cover>.incdef
+##                                                 in one process and store <cover>.*.mem (see imagearchive.py),
+##                                                 or with axasm next to header.inc if native assembler disabled
+
+import re
+import os
+import sys
+import ast
+import glob
+import shutil
+import subprocess
+import config as cf
+import imagearchive
+
+
+reToken = re.compile(r'\s+|[A-Za-z_]\w*|0[xX][0-9A-Fa-f]+[uUlL]*|\d+[uUlL]*|<<|>>|\.\.\.|.')
+reDefine = re.compile(r'\s*#\s*define\s+(\w+)(\([^)]*\))?(.*)$')
+reInclude = re.compile(r'\s*#\s*include\s+"([^"]+)"')
+primitives = {'ORG', 'REORG', 'END', 'DEFLABEL', 'LABEL', 'DB'}        # Processor macros generating the C program, interpreted directly by the assembler
+mask32 = (1 << 32) - 1
+
+def tokenize(text):                                                     # Auxiliary Function: C tokens (whitespace kept) with empty hide sets
+  return [(token, frozenset()) for token in reToken.findall(text)]
+
+def readDefines(path,macros):                                           # Read macro definitions of a C header (quoted includes followed, other directives ignored)
+  with open(path) as f:
+    text = f.read()
+  text = re.sub(r'/\*.*?\*/', ' ', text, flags=re.DOTALL).replace('\\\n', ' ')
+  for line in text.split('\n'):
+    line = line.split('//')[0]
+    addDefine(line,macros)
+    matchInclude = reInclude.match(line)
+    if matchInclude:
+      candidates = [os.path.join(os.path.dirname(path), matchInclude.group(1)), matchInclude.group(1)]  # Like gcc: directory of header first, then working directory (-I of axasm)
+      readDefines(next((c for c in candidates if os.path.exists(c)), candidates[0]), macros)
+  return macros
+
+def addDefine(line,macros):                                             # Auxiliary Function: Add '#define' line to macros (name: parameter list or None, body tokens)
+  matchDefine = reDefine.match(line)
+  if matchDefine and matchDefine.group(1) not in primitives:
+    params = None
+    if matchDefine.group(2) is not None:
+      params = [param.strip() for param in matchDefine.group(2)[1:-1].split(',')]
+    macros[matchDefine.group(1)] = (params, tokenize(matchDefine.group(3).strip()))
+
+def collectArgs(tokens,i):                                              # Auxiliary Function: Arguments of macro invocation with '(' at index i, and index after ')'
+  args = [[]]
+  depth = 0
+  for j in range(i+1, len(tokens)):
+    token = tokens[j][0]
+    if token == ')' and depth == 0:
+      return args, j+1
+    if token == ',' and depth == 0:
+      args.append([])
+      continue
+    depth += {'(' : 1, ')' : -1}.get(token, 0)
+    args[-1].append(tokens[j])
+  raise ValueError('Unterminated macro invocation.')
+
+def expand(tokens,macros):                                              # Expand macros like the C preprocessor (arguments expanded first, result rescanned with following tokens)
+  tokens = list(tokens)
+  output = []
+  i = 0
+  while i < len(tokens):
+    name, hide = tokens[i]
+    if name not in macros or name in hide:
+      output.append(tokens[i])
+      i += 1
+      continue
+    params, body = macros[name]
+    hide = hide.union({name})
+    if params is None:
+      tokens[i:i+1] = [(token, hide.union(h)) for token, h in body]
+      continue
+    j = i+1
+    while j < len(tokens) and tokens[j][0].isspace():
+      j += 1
+    if j == len(tokens) or tokens[j][0] != '(':                         # Function-like macro name without arguments is not expanded
+      output.append(tokens[i])
+      i += 1
+      continue
+    args, end = collectArgs(tokens,j)
+    values = {}
+    for k, param in enumerate(params):
+      if param == '...':
+        values['__VA_ARGS__'] = [token for arg in args[k:] for token in arg + [(',', frozenset())]][:-1]
+      else:
+        values[param] = args[k] if k < len(args) else []
+    values = {param : expand(arg,macros) for param, arg in values.items()}
+    replacement = []
+    for token, h in body:
+      replacement.extend(values[token] if token in values else [(token, h)])
+    tokens[i:end] = [(token, hide.union(h)) for token, h in replacement]
+  return output
+
+def cInt(token):                                                        # Auxiliary Function: Value of C integer literal
+  token = token.rstrip('uUlL')
+  if token[:2].lower() == '0x':
+    return int(token, 16)
+  if len(token) > 1 and token[0] == '0':
+    return int(token, 8)
+  return int(token)
+
+class Wrap32(ast.NodeTransformer):                                      # Auxiliary Class: Rewrite Python expression to 32-bit unsigned arithmetic on symbol table n
+  def visit_BinOp(self,node):
+    if type(node.op) not in (ast.Add, ast.Sub, ast.Mult, ast.FloorDiv, ast.Mod, ast.LShift, ast.RShift, ast.BitAnd, ast.BitOr, ast.BitXor):
+      raise ValueError(f'Unsupported operator in {ast.unparse(node)}.')
+    return ast.BinOp(self.generic_visit(node), ast.BitAnd(), ast.Constant(mask32))
+  def visit_UnaryOp(self,node):
+    if type(node.op) not in (ast.USub, ast.UAdd, ast.Invert):
+      raise ValueError(f'Unsupported operator in {ast.unparse(node)}.')
+    return ast.BinOp(self.generic_visit(node), ast.BitAnd(), ast.Constant(mask32))
+  def visit_Name(self,node):
+    return ast.Subscript(ast.Name('n', ast.Load()), ast.Constant(node.id), ast.Load())
+  def generic_visit(self,node):
+    if not isinstance(node, (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.operator, ast.unaryop, ast.Load)) \
+    or isinstance(node, ast.Constant) and type(node.value) is not int:
+      raise ValueError(f'Unsupported expression {ast.unparse(node)}.')
+    return super().generic_visit(node)
+
+exprCache = {}
+def compileExpr(tokens):                                                # Compile expanded C expression to function of symbol table (32-bit unsigned arithmetic like labels and addresses)
+  text = ''
+  for token, hide in tokens:
+    if token[0].isdigit():
+      token = str(cInt(token) & mask32)
+    elif token == '/':
+      token = '//'
+    text += token
+  text = text.strip()
+  if text not in exprCache:
+    tree = ast.fix_missing_locations(Wrap32().visit(ast.parse(text, mode='eval')))
+    exprCache[text] = (text, compile(tree, '<asm>', 'eval'))
+  return exprCache[text]
+
+def evaluate(expr,names):                                               # Evaluate compiled expression with values of symbols
+  text, code = expr
+  try:
+    return eval(code, {}, {'n' : names})
+  except KeyError as err:
+    raise ValueError(f'Undefined symbol {err.args[0]} in {text}.')
+
+def asmStatements(lines,macros):                                        # Translate ASM lines to C statements like solopre.awk (collects '##define' lines into macros)
+  statements = []
+  labels = set()
+  defines = []
+  for line in lines:
+    if re.match(r'^[ \t]*##', line):
+      defines.append(re.sub(r'^[ \t]*##', '#', line))
+      addDefine(defines[-1], macros)
+      continue
+    if re.match(r'^[ \t]*#', line):
+      statements.append(re.sub(r'^[ \t]*#', '', line))
+      continue
+    line = re.sub(r";[^'\"].*$", '', line.rstrip('\n'))                # Remove ASM comments
+    fields = line.split()
+    op = 0
+    if re.match(r'^[ \t]*[^ \t,]+:', line):                             # Label
+      label = re.sub(r':$', '', fields[0])
+      labels.add(label)
+      statements.append(f'LABEL({label})')
+      op = 1
+    if len(fields) <= op:
+      continue
+    mac = fields[op].upper()
+    if mac in ('STRING', 'STRINGPACK'):
+      raise ValueError(f'{mac} is not supported.')
+    statements.append(mac if len(fields) == op+1 else f'{mac}({" ".join(fields[op+1:])})')
+  return statements, labels, tuple(defines)
+
+def primitiveStatements(tokens,macros):                                 # Auxiliary Function: Split expanded statement into primitives with compiled arguments
+  code = []
+  current = []
+  depth = 0
+  for token in tokens + [(';', frozenset())]:
+    depth += {'(' : 1, ')' : -1}.get(token[0], 0)
+    if token[0] == ';' and depth == 0:
+      current = [t for t in current if not t[0].isspace()]
+      if len(current) > 0:
+        primitive = current[0][0]
+        args = collectArgs(current,1)[0] if len(current) > 1 else []
+        if primitive == 'DB':
+          args = compileExpr(args[0] + expand(tokenize('&DMASK'),macros))  # DB(n) stores n&DMASK (textual like the C macro)
+        elif primitive in ('ORG', 'REORG'):
+          args = compileExpr(args[0])
+        elif primitive == 'LABEL':
+          args = args[0][0][0]
+        elif primitive != 'END':
+          raise ValueError(f'Unknown statement {primitive}.')
+        code.append((primitive, args))
+      current = []
+    else:
+      current.append(token)
+  return code
+
+def assemble(lines,macros,cache=None):                                  # Assemble ASM program (list of lines) with processor macros, return Verilog memory image (cache: expanded statements shared by programs with same macros)
+  macros = dict(macros)
+  statements, labelNames, defines = asmStatements(lines,macros)
+  cache = {} if cache is None else cache
+  code = []
+  for statement in statements:                                          # Expand macros and split into primitive statements
+    if (defines, statement) not in cache:
+      cache[(defines, statement)] = primitiveStatements(expand(tokenize(statement),macros),macros)
+    code.extend(cache[(defines, statement)])
+  memsize = evaluate(compileExpr(expand(tokenize('(1<<NANO_I_ADR_W)-1'),macros)), {})
+  names = {label : 0 for label in labelNames}                           # Labels are static variables: pass 2 sees the addresses of pass 1
+  for asmPass in (1, 2):
+    mem = {}
+    addr = begin = end = None
+    for primitive, args in code:
+      names['_solo_add'] = addr
+      if primitive == 'ORG':
+        addr = begin = evaluate(args,names)
+      elif primitive == 'REORG':
+        addr = evaluate(args,names)
+      elif primitive == 'LABEL':
+        names[args] = addr
+      elif primitive == 'DB':
+        if addr >= memsize:
+          raise ValueError(f'Program exceeds instruction memory ({memsize} nibbles).')
+        mem[addr] = evaluate(args,names)                                # Value is evaluated with address before increment
+        addr += 1
+      elif primitive == 'END':
+        end = addr - 1
+        break
+  output = f'@{begin:X} '
+  for i in range(begin, end+1, 16):                                     # Two 4-bit instructions per byte (soloasm Verilog output)
+    for j in range(0, 16, 2):
+      if i+j <= end:
+        output += f'{(mem.get(i+j+1, 0) & 15) | ((mem.get(i+j, 0) & 15) << 4):02X} '
+    output += '\n'
+  return output
+
+def assembleDir(outdir,header):                                         # Assemble all schedules of all covers in output directory
+  asmdir = os.path.dirname(header) or '.'
+  headerMacros = readDefines(header,{})
+  for incdef in sorted(glob.glob(os.path.join(glob.escape(outdir), '*.incdef'))):
+    cover = os.path.basename(incdef)[:-len('.incdef')]
+    if cf.nativeAssembler:
+      macros = readDefines(incdef,dict(headerMacros))
+      cache = {}
+    else:
+      shutil.copy(os.path.join(outdir, f'{cover}.inc'), asmdir)         # axasm expects processor include next to itself
+    for path in sorted(glob.glob(os.path.join(glob.escape(outdir), f'{glob.escape(cover)}.*.asm'))):
+      if cf.nativeAssembler:
+        with open(path) as f:
+          image = assemble(f.readlines(),macros,cache)
+      else:
+        image = subprocess.run([os.path.join(asmdir, 'axasm'), '-p', cover, '-v', path], stdout=subprocess.PIPE, text=True, check=True).stdout
+      imagearchive.write(outdir, os.path.basename(path)[:-len('.asm')] + '.mem', image)
+    if not cf.nativeAssembler:
+      os.remove(os.path.join(asmdir, f'{cover}.inc'))
+  imagearchive.close(outdir)
+
+if __name__ == '__main__':
+  if os.path.isdir(sys.argv[1]):
+    assembleDir(sys.argv[1], sys.argv[2])
+  else:
+    with open(sys.argv[2]) as f:
+      sys.stdout.write(assemble(f.readlines(), readDefines(sys.argv[1],{})))
@@ -13,10 +13,4 @@ app=$(basename $1 .ast)
 
 cat $1 | ./ast2ddgs.py $app
 
-for f in ${app}*.ddg
-do
-  ddg=$(basename $f .ddg)
-  { echo "== START == $(date) ==" > $ddg.log; { cat $f | ./ddg2sets.py | ./sets2slack2cover.py | ./cover2code.py; } 1> $ddg.code 2>> $ddg.log; echo "== END == $(date) ==" >> $ddg.log; } &
-done
-
-wait
+./ddgs2codes.py ${app}*.ddg
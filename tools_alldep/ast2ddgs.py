@@ -10,6 +10,8 @@
 import sys
 import tempfile
 import ast
+import hashlib
+import random
 import config as cf
 
 
@@ -45,6 +47,22 @@ def recBlockPerm(fencedBB,bbList):                                      # Auxili
         for i in recBlockPerm(newFencedBB,bbList):
           yield i
 
+def nodeKey(node):                                                      # Auxiliary Function: Hashable key of node content for canonical relabeling (same attributes as func_match)
+  return tuple((attr, tuple(sorted(node[attr]))) if attr != 'opcode' else (attr, node[attr]) for attr in ('opcode','def','use'))
+
+def canonicalDDG(blocklist,blockedges):                                 # Auxiliary Function: Canonical form of per-block edge lists of a DDG permutation
+  labels = {}
+  occurrences = {}
+  num = 0
+  for block in blocklist:                                               # Relabel node numbers by node content, identical nodes distinguished by order of occurrence
+    for n in block:
+      num += 1
+      key = nodeKey(n)
+      occurrences[key] = occurrences.get(key,0) + 1
+      labels[num] = (key, occurrences[key])
+  canon = tuple(tuple(sorted((labels[i],labels[j]) for i,j in edges)) for edges in blockedges)
+  return hashlib.sha256(repr(canon).encode()).hexdigest()               # Permutations with identical relabeled edge lists result in isomorphic DDGs
+
 def recBlockLists(bbPerms,solution):                                    # Auxiliary Function: Recursively get all block lists of DDG permutations
   if len(bbPerms) == 0:
     yield solution
@@ -53,6 +71,38 @@ def recBlockLists(bbPerms,solution):                                    # Auxili
       for i in recBlockLists(bbPerms[1:],solution+[j]):
         yield i
 
+def sampleBlockLists(bbPerms,budget,seed,mode):                         # Auxiliary Function: Draw a budget of block lists of DDG permutations (with their index in the full cross product)
+  rng = random.Random(seed)
+  samples = set()
+  if mode == 'stratified':                                              # Stratified: each permutation of each basic block is drawn equally often (shuffled round robin), ...
+    columns = []
+    for perms in bbPerms:
+      column = []
+      while len(column) < budget:
+        order = list(range(len(perms)))
+        rng.shuffle(order)
+        column.extend(order)
+      columns.append(column[:budget])
+    samples.update(zip(*columns))                                       # ... duplicate draws are only emitted once
+  else:                                                                 # Uniform: draw distinct indices of the full cross product at random
+    total = 1
+    for perms in bbPerms:
+      total *= len(perms)
+    indices = set()
+    while len(indices) < budget:
+      indices.add(rng.randrange(total))
+    for idx in indices:                                                 # decode index to basic block permutation choices (mixed radix, first basic block most significant)
+      choice = []
+      for perms in reversed(bbPerms):
+        idx, c = divmod(idx, len(perms))
+        choice.append(c)
+      samples.add(tuple(reversed(choice)))
+  for choice in sorted(samples):                                        # Yield in order of the full cross product, index as in recBlockLists
+    idx = 0
+    for c, perms in zip(choice, bbPerms):
+      idx = idx * len(perms) + c
+    yield idx, [perms[c] for c, perms in zip(choice, bbPerms)]
+
 
 argc = len(sys.argv)
 if argc > 2:
@@ -79,10 +129,23 @@ if cf.debugStdErr:
   print([len(i) for i in bbPerms], file=sys.stderr)
 
 
-ddgcnt = 0
-blocklistOut = []
-blockedgesOut = []
-for blocklist in recBlockLists(bbPerms,[]):                             # Pass 2: Generate output for each DDG block list
+ddgcnt = 1
+for perms in bbPerms:                                                   # Precompute number of DDG permutations (product of basic block permutations) for output digit width
+  ddgcnt *= len(perms)
+ddgDigits = len(str(ddgcnt))
+
+
+if cf.ddgSampleBudget is not None and cf.ddgSampleBudget < ddgcnt:    # Sampling mode: only generate a budget of DDG permutations
+  blocklists = sampleBlockLists(bbPerms,cf.ddgSampleBudget,cf.ddgSampleSeed,cf.ddgSampleMode)
+else:
+  blocklists = enumerate(recBlockLists(bbPerms,[]))
+
+sampledcnt = 0
+ddgOut = []
+ddgClasses = {}
+ddgManifest = {}
+for t, blocklist in blocklists:                                         # Pass 2: Generate output for each DDG block list
+  sampledcnt += 1
   blockedges = []
   nodenum = 0
   for block in blocklist:                                               # Analyze dependencies by tracking def-use, use-def and def-def, and build edge list
@@ -101,13 +164,30 @@ for blocklist in recBlockLists(bbPerms,[]):                             # Pass 2
         appendDepEdgesFrom(defs)
       addNodeStatesTo(uses,'use')                                       # update defs and uses with current node
       addNodeStatesTo(defs,'def')
-  blocklistOut.append(blocklist)                                        # collect output of each DDG block list
-  blockedgesOut.append(blockedges)
-  ddgcnt += 1
+  if cf.ddgDedupPermutations:                                           # Deduplication: Only the first permutation of each equivalence class is emitted as representative
+    canon = canonicalDDG(blocklist,blockedges)
+    if canon not in ddgClasses:
+      ddgClasses[canon] = t
+    ddgManifest[t] = ddgClasses[canon]
+    if ddgManifest[t] != t:
+      continue
+  if cf.ddgStreamOutput:                                                # Streaming mode: write output file of DDG block list right away (constant memory)
+    with open(f"{outname}{t:0{ddgDigits}}.ddg", "w") as outf:
+      print(repr((header,blocklist,blockedges)), file=outf)
+  else:
+    ddgOut.append((t,blocklist,blockedges))                             # otherwise, collect output of each DDG block list
+
+for t, blocklist, blockedges in ddgOut:                                 # Pass 3: Generate output files for each collected DDG (non-streaming mode only)
+  with open(f"{outname}{t:0{ddgDigits}}.ddg", "w") as outf:
+    print(repr((header,blocklist,blockedges)), file=outf)
 
-for t in range(ddgcnt):                                                 # Pass 3: Generate output files for each DDG
-  with open(f"{outname}{t:0{len(str(ddgcnt))}}.ddg", "w") as outf:
-    print(repr((header,blocklistOut[t],blockedgesOut[t])), file=outf)
+if cf.ddgDedupPermutations:                                             # Manifest maps each DDG permutation index to its emitted representative
+  with open(f"{outname}.manifest", "w") as outf:
+    print(repr(ddgManifest), file=outf)
 
 if cf.debugStdErr:
-  print(f'{ddgcnt} DDG permutations generated.', file=sys.stderr)
+  print(f'{sampledcnt} DDG permutations generated.', file=sys.stderr)
+  if sampledcnt < ddgcnt:
+    print(f'{ddgcnt-sampledcnt} of {ddgcnt} DDG permutations skipped by {cf.ddgSampleMode} sampling (seed {cf.ddgSampleSeed}).', file=sys.stderr)
+  if cf.ddgDedupPermutations:
+    print(f'{len(ddgClasses)} unique DDG permutations emitted after deduplication.', file=sys.stderr)
@@ -0,0 +1,62 @@
+## Copyright (c) 2025 Chair for Chip Design for Embedded Computing,
+##                    TU Braunschweig, Germany
+##                    www.tu-braunschweig.de/en/eis
+##
+## Use of this source code is governed by an MIT-style
+## license that can be found in the LICENSE file or at
+## https://opensource.org/licenses/MIT.
+
+## Content-addressed store of per-basic-block results (candidate instruction sets, shortest instruction covers)
+## and of shortest Cycle LUT assemblies, shared by all pipelines using the same store directory. Node numbers are
+## stored relative to the basic block node, entries are written atomically and never modified, so concurrent
+## pipelines can read and fill the store.
+
+import os
+import ast
+import hashlib
+import tempfile
+import networkx as nx
+import config as cf
+
+
+def canonicalValue(value):                                              # Auxiliary Function: Hash-seed independent representation of node attribute values
+  if isinstance(value, (set, frozenset, dict, list, tuple)):
+    return tuple(sorted(canonicalValue(i) for i in value))
+  return value
+
+def blockKey(depG,bb,extra=None):                                       # Auxiliary Function: Content address of a basic block (nodes and edges relative to basic block node)
+  block = sorted({bb}.union(nx.descendants(depG,bb)))
+  nodes = tuple(tuple(sorted((attr, canonicalValue(val)) for attr, val in depG.nodes[node].items() if attr != 'srcline')) for node in block)
+  edges = tuple(sorted((i-bb, j-bb) for i, j in depG.subgraph(block).edges))
+  return hashlib.sha256(repr((nodes, edges, extra)).encode()).hexdigest()
+
+def valueKey(value):                                                    # Auxiliary Function: Content address of a hash-seed independent value (e.g., sorted string multiset)
+  return hashlib.sha256(repr(value).encode()).hexdigest()
+
+def relative(nodesets,bb):                                              # Auxiliary Function: Node sets with node numbers relative to basic block node
+  return sorted(tuple(sorted(node-bb for node in nodeset)) for nodeset in nodesets)
+
+def absolute(nodesets,bb):                                              # Auxiliary Function: Node sets with node numbers relative to basic block node back in dependency graph
+  return [frozenset(node+bb for node in nodeset) for nodeset in nodesets]
+
+def entryPath(kind,key):                                                # Auxiliary Function: File of store entry (kind is 'sets', 'cover' or 'assembly')
+  return os.path.join(cf.blockStoreDir, kind, key[:2], key)
+
+def load(kind,key):                                                     # Load entry from store (None if not yet computed or store disabled)
+  if cf.blockStoreDir is None:
+    return None
+  try:
+    with open(entryPath(kind,key)) as f:
+      return ast.literal_eval(f.read())
+  except (OSError, ValueError, SyntaxError):
+    return None
+
+def save(kind,key,value):                                               # Save entry to store (atomically, concurrent writers of the same entry write identical content)
+  if cf.blockStoreDir is None:
+    return
+  path = entryPath(kind,key)
+  os.makedirs(os.path.dirname(path), exist_ok=True)
+  fd, tmpPath = tempfile.mkstemp(dir=os.path.dirname(path))
+  with os.fdopen(fd, 'w') as f:
+    print(repr(value), file=f)
+  os.replace(tmpPath, path)
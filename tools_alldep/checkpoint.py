@@ -0,0 +1,86 @@
+## Copyright (c) 2025 Chair for Chip Design for Embedded Computing,
+##                    TU Braunschweig, Germany
+##                    www.tu-braunschweig.de/en/eis
+##
+## Use of this source code is governed by an MIT-style
+## license that can be found in the LICENSE file or at
+## https://opensource.org/licenses/MIT.
+
+## Checkpoints of long-running search stages (sets2slack2cover.py, cover2code.py). A checkpoint holds the search
+## position and the best solutions found so far, keyed by a hash of the stage input and its configuration, so an
+## interrupted run with the same input resumes where it stopped. Also provides the wall-clock budget of a stage.
+
+import os
+import sys
+import ast
+import time
+import signal
+import hashlib
+import tempfile
+import networkx as nx
+import config as cf
+
+
+lastSave = time.time()
+
+def canonical(value):                                                   # Auxiliary Function: Hash-seed independent representation of stage input (sets sorted, lists kept in order)
+  if isinstance(value, nx.Graph):
+    return (tuple(sorted((node, canonical(attr)) for node, attr in value.nodes.items())), tuple(sorted(value.edges)))
+  if isinstance(value, dict):
+    return tuple(sorted((key, canonical(val)) for key, val in value.items()))
+  if isinstance(value, (set, frozenset)):
+    return tuple(sorted(canonical(i) for i in value))
+  if isinstance(value, (list, tuple)):
+    return tuple(canonical(i) for i in value)
+  return value
+
+def inputKey(stage,*args):                                              # Auxiliary Function: Checkpoint key of a stage run
+  return hashlib.sha256(repr((stage, canonical(args))).encode()).hexdigest()
+
+def ckptPath(stage,key):                                                # Auxiliary Function: Checkpoint file of a stage run
+  return os.path.join(cf.checkpointDir, f'{stage}_{key}.ckpt')
+
+def load(stage,key):                                                    # Load state of an interrupted run (None if no checkpoint, checkpoints disabled, or resume disabled)
+  if cf.checkpointDir is None or not cf.checkpointResume:
+    return None
+  try:
+    with open(ckptPath(stage,key)) as f:
+      state = ast.literal_eval(f.read())
+  except (OSError, ValueError, SyntaxError):
+    return None
+  if cf.debugStdErr:
+    print(f'[CHECKPOINT] Resuming {stage} from {ckptPath(stage,key)}.', file=sys.stderr)
+  return state
+
+def due():                                                              # Is the next periodic checkpoint due?
+  return cf.checkpointDir is not None and time.time() - lastSave >= cf.checkpointInterval
+
+def save(stage,key,state):                                              # Save state atomically (a killed process never leaves a broken checkpoint)
+  global lastSave
+  if cf.checkpointDir is None:
+    return
+  os.makedirs(cf.checkpointDir, exist_ok=True)
+  fd, tmpPath = tempfile.mkstemp(dir=cf.checkpointDir)
+  with os.fdopen(fd, 'w') as f:
+    print(repr(state), file=f)
+  os.replace(tmpPath, ckptPath(stage,key))
+  lastSave = time.time()
+
+def remove(stage,key):                                                  # Remove checkpoint after the search has completed
+  if cf.checkpointDir is None:
+    return
+  try:
+    os.remove(ckptPath(stage,key))
+  except OSError:
+    pass
+
+def startBudget(handler):                                               # Deliver current solutions via handler when the wall-clock budget of the stage is exhausted
+  global lastSave
+  lastSave = time.time()
+  if cf.searchTimeBudget is not None:
+    signal.signal(signal.SIGALRM, handler)
+    signal.setitimer(signal.ITIMER_REAL, cf.searchTimeBudget)
+
+def stopBudget():
+  if cf.searchTimeBudget is not None:
+    signal.setitimer(signal.ITIMER_REAL, 0)
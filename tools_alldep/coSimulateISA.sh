@@ -22,25 +22,28 @@ if [ -d "$1" ]; then
   echo "SIZE_CLUT,SIZE_SCHG,SIZE_IMEM,STEP_GROUPS_DUT" > $dirname/$synconf
   echo "idx,SIZE_CLUT,SIZE_SCHG,SIZE_IMEM,STEP_GROUPS_DUT" > $dirname/$tabconf
   
-  for fname in $1/*.*.+(0).clut
+  imgdir=$1
+  if ./imagearchive.py $1 enabled; then
+    imgdir=$dirname/img
+  fi
+  ./imagearchive.py $1 extract $imgdir goldenref.clut goldenref.schg goldenref.mem
+  read clutref schgref imemref <<< $(./imagearchive.py $1 size goldenref.clut goldenref.schg goldenref.mem)
+  
+  for fname in $(./imagearchive.py $1 list '*.*.*.clut' | grep -E '\.0+\.clut$')
   do
     isaname=`basename $fname | cut -d. -f 1`
     dutname=`basename $fname | cut -d. -f 1-2`
   
-    for lutname in $1/$dutname.*.clut
+    for lutname in $(./imagearchive.py $1 list "$dutname.*.clut")
     do
     
       lutidx=.`basename $lutname | cut -d. -f 3`
       echo "-N- SOLUTION $dutname$lutidx" > $dirname/$dutname$lutidx.log
       
-      clutref=`expr $(cat $1/goldenref.clut | wc -w) - 1`
-      schgref=`expr $(cat $1/goldenref.schg | wc -w) - 1`
-      imemref=`expr $(cat $1/goldenref.mem | wc -w) - 1`
       echo "-N- REF: $clutref $schgref $imemref" >> $dirname/$dutname$lutidx.log
       
-      clutdut=`expr $(cat $1/$dutname$lutidx.clut | wc -w) - 1`
-      schgdut=`expr $(cat $1/$dutname$lutidx.schg | wc -w) - 1`
-      imemdut=`expr $(cat $1/$dutname.mem | wc -w) - 1`
+      read clutdut schgdut imemdut <<< $(./imagearchive.py $1 size $dutname$lutidx.clut $dutname$lutidx.schg $dutname.mem)
+      ./imagearchive.py $1 extract $imgdir $dutname$lutidx.clut $dutname$lutidx.schg $dutname.mem
       echo "-N- DUT: $clutdut $schgdut $imemdut" >> $dirname/$dutname$lutidx.log
       
       clut=`echo "$bcdefs; max($clutref,$clutdut)" | bc`
@@ -52,8 +55,8 @@ if [ -d "$1" ]; then
       stpgrp=`echo "$bcdefs; max(6,$stpgrp)" | bc`
       echo "-N- DUT STEP_GROUPS: $stpgrp" >> $dirname/$dutname$lutidx.log
       
-      make -C sim SIM_GENERICS="-ggoldenref=\"../$1/goldenref\" -gdutfiles=\"../$1/$dutname\" -glutidx=\"$lutidx\" -gSIZE_CLUT=$clut -gSIZE_SCHG=$schg -gSIZE_IMEM=$imem -gSTEP_GROUPS_GOLDEN=6 -gSTEP_GROUPS_DUT=$stpgrp" clean-sim sim-hdl >> $dirname/$dutname$lutidx.log
-      #make -C sim SIM_GENERICS="-ggoldenref=\"../$1/goldenref\" -gdutfiles=\"../$1/$dutname\" -glutidx=\"$lutidx\" -gSIZE_CLUT=$clut -gSIZE_SCHG=$schg -gSIZE_IMEM=$imem -gSTEP_GROUPS_GOLDEN=6 -gSTEP_GROUPS_DUT=$stpgrp" clean-sim sim-hdl-gui
+      make -C sim SIM_GENERICS="-ggoldenref=\"../$imgdir/goldenref\" -gdutfiles=\"../$imgdir/$dutname\" -glutidx=\"$lutidx\" -gSIZE_CLUT=$clut -gSIZE_SCHG=$schg -gSIZE_IMEM=$imem -gSTEP_GROUPS_GOLDEN=6 -gSTEP_GROUPS_DUT=$stpgrp" clean-sim sim-hdl >> $dirname/$dutname$lutidx.log
+      #make -C sim SIM_GENERICS="-ggoldenref=\"../$imgdir/goldenref\" -gdutfiles=\"../$imgdir/$dutname\" -glutidx=\"$lutidx\" -gSIZE_CLUT=$clut -gSIZE_SCHG=$schg -gSIZE_IMEM=$imem -gSTEP_GROUPS_GOLDEN=6 -gSTEP_GROUPS_DUT=$stpgrp" clean-sim sim-hdl-gui
       
       st=`cat $dirname/$dutname$lutidx.log | grep 'Fatal:' | wc -l`
       if [ "$st" -ne 0 ]; then
@@ -8,6 +8,7 @@
 ## https://opensource.org/licenses/MIT.
 
 set -e
+set -o pipefail
 
 rm -rf $1/
 cat $1.code | ./code2asm.py $1
@@ -17,19 +18,11 @@ for f in $1/*.incdef
 do
   cover=$(basename $f .incdef)
   cat ../asm/nano.template.header.inc $1/$cover.incdef ../asm/nano.template.footer.inc > $1/$cover.inc
-  cp $1/$cover.inc ../asm
-  
-  for g in $1/$cover.*.asm
-  do
-    img=$(basename $g .asm)
-    ../asm/axasm -p $cover -v $g > $1/$img.mem
-  done
-  
-  rm ../asm/$cover.inc
-  
 done
 
+./asm2mem.py $1 ../asm/nano.template.header.inc
+
 ### Golden Reference
-../asm/axasm -p nano -v ../sw/$1.asm > $1/goldenref.mem
-cp ../sim/img/nano_clut.mem $1/goldenref.clut
-cp ../sim/img/nano_schg.mem $1/goldenref.schg
+../asm/axasm -p nano -v ../sw/$1.asm | ./imagearchive.py $1 add goldenref.mem
+./imagearchive.py $1 add goldenref.clut < ../sim/img/nano_clut.mem
+./imagearchive.py $1 add goldenref.schg < ../sim/img/nano_schg.mem
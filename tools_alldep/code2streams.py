@@ -15,6 +15,7 @@ import networkx as nx
 from networkx.drawing.nx_pydot import write_dot
 from networkx.readwrite import json_graph
 import config as cf
+import imagearchive
 
 
 def genCycleLUTSchedule(s):                                             # Auxiliary Function: Generate all possible Cycle LUT schedules via recursion
@@ -51,6 +52,51 @@ def posInCycleLUT(sublist,inlist):                                      # Auxili
     if inlist[i:i+len(sublist)] == sublist:
       return i
 
+def bestCycleLUTOrders(s,enclist):                                      # Auxiliary Function: All Cycle LUT schedules with lowest maximum base address (same results and order as genCycleLUTSchedule)
+  strEnc = {string : [cf.cwID[i] for i in string] for string in s}      # Encoding of each assembled string
+  total = sum([len(enc) for enc in strEnc.values()])
+  tailLen = max([len(sublist) for sublist in enclist]) - 1              # Only the end of a prefix can be part of later first occurrences
+
+  def extend(tail,length,known,string):                                 # Base addresses of instructions first occurring when string is appended to prefix (ending with tail)
+    window = list(tail) + strEnc[string]
+    found = {}
+    for instIdx, sublist in enumerate(enclist):
+      if instIdx not in known:
+        start = max(len(tail)-len(sublist)+1, 0)                        # Occurrences entirely in prefix are already known
+        pos = posInCycleLUT(sublist,window[start:])
+        if pos is not None:
+          found[instIdx] = length - len(tail) + start + pos
+    return found, tuple(window[max(len(window)-tailLen,0):])
+
+  memo = {}
+  def futureMax(rest,known,tail):                                       # Lowest maximum base address of instructions not yet known over all orders of remaining strings
+    if len(rest) == 0:
+      return -1
+    key = (rest, known, tail)
+    if key not in memo:
+      length = total - sum([len(strEnc[string]) for string in rest])
+      memo[key] = min([max([*found.values(), futureMax(rest.difference({string}),known.union(found),newTail)]) for string in rest for found, newTail in [extend(tail,length,known,string)]])
+    return memo[key]
+
+  bestBaseAddr = futureMax(frozenset(s),frozenset(),())
+  cycleEnc = []
+  posInCLUT = []
+  def recurse(rest,prefix,known,tail):                                  # Enumerate orders like genCycleLUTSchedule, only entering subtrees that reach lowest maximum base address
+    if len(rest) == 0:
+      cycleEnc.append(prefix)
+      posInCLUT.append([known[instIdx] for instIdx in range(len(enclist))])
+      return
+    for string in rest:
+      if cf.cLUTOrderMaxSolutions is not None and len(cycleEnc) >= cf.cLUTOrderMaxSolutions:
+        return
+      found, newTail = extend(tail,len(prefix),known,string)
+      newRest = rest.difference({string})
+      if max(found.values(), default=-1) > bestBaseAddr or futureMax(frozenset(newRest),frozenset(known).union(found),newTail) > bestBaseAddr:
+        continue
+      recurse(newRest,prefix+strEnc[string],{**known, **found},newTail)
+  recurse(s,[],{},())
+  return cycleEnc, posInCLUT, bestBaseAddr
+
 def genStateChgEntries(stringlist,enclist):                             # Auxiliary Function: Generate State Change LUT modifiers from opcodes in LUT string list
   for i,string in enumerate(stringlist):
     output = cf.schgDefault.copy()
@@ -111,7 +157,10 @@ for idx, codeG in enumerate(codeGraphs):
   encLUTString = list(encodeCycleLUTCodes(LUTStringLists[idx]))
   if any(len(sublist) == 0 for sublist in encLUTString):                # Exclusion Criterion: If an instruction within a cover only consists of immediate loading (no cycle LUT encoding), ...
     continue                                                            # ... exclude for now (not supported by current architecture)
-  schedCycleLUTs = [list(genCycleLUTSchedule(s)) for s in LUTAssemblies[idx]]
+  if cf.cLUTOrderSearch:
+    schedCycleLUTs = LUTAssemblies[idx]
+  else:
+    schedCycleLUTs = [list(genCycleLUTSchedule(s)) for s in LUTAssemblies[idx]]
   stateChgEntries = list(genStateChgEntries(LUTStringLists[idx],encLUTString))
   if cf.debugStdErr:
     print(f'Code {idx}:', file=sys.stderr)
@@ -123,21 +172,24 @@ for idx, codeG in enumerate(codeGraphs):
       print(t, file=outf)
     print(f"\nSTEP_GROUPS:\n{max([len(s) for s in encLUTString])}", file=outf)
   for schedIdx, s in enumerate(schedCycleLUTs):
-    bestBaseAddr = None
-    cycleEnc = []
-    posInCLUT = []
-    for enc in encodeCycleLUTNames(s):                                  # Evaluate each cycle LUT encoding
-      poslist = [posInCycleLUT(sublist,enc) for sublist in encLUTString]
-      maxBaseAddr = max(poslist)
-      if bestBaseAddr is not None:                                      # Only keep solutions with lowest maximum base address (save bits in State Change LUT) - if a new minimum is achieved, non-minimum solutions are cleared from further consideration
-        if maxBaseAddr > bestBaseAddr:
-          continue
-        elif maxBaseAddr < bestBaseAddr:
-          cycleEnc.clear()
-          posInCLUT.clear()
-      bestBaseAddr = maxBaseAddr
-      cycleEnc.append(enc)
-      posInCLUT.append(poslist)
+    if cf.cLUTOrderSearch:                                              # Find string orders with lowest maximum base address directly
+      cycleEnc, posInCLUT, bestBaseAddr = bestCycleLUTOrders(s,encLUTString)
+    else:
+      bestBaseAddr = None
+      cycleEnc = []
+      posInCLUT = []
+      for enc in encodeCycleLUTNames(s):                                # Evaluate each cycle LUT encoding
+        poslist = [posInCycleLUT(sublist,enc) for sublist in encLUTString]
+        maxBaseAddr = max(poslist)
+        if bestBaseAddr is not None:                                    # Only keep solutions with lowest maximum base address (save bits in State Change LUT) - if a new minimum is achieved, non-minimum solutions are cleared from further consideration
+          if maxBaseAddr > bestBaseAddr:
+            continue
+          elif maxBaseAddr < bestBaseAddr:
+            cycleEnc.clear()
+            posInCLUT.clear()
+        bestBaseAddr = maxBaseAddr
+        cycleEnc.append(enc)
+        posInCLUT.append(poslist)
     stateChgSolutions = list(updateStateChgForCycleLUT(stateChgEntries,posInCLUT))
     if cf.debugStdErr:
       #print(posInCLUT, file=sys.stderr)
@@ -146,9 +198,10 @@ for idx, codeG in enumerate(codeGraphs):
       print(f'Maximum encoded Base Address value is {bestBaseAddr}.', file=sys.stderr)
       print(f'Maximum encoded Cycode value is {max(map(lambda x:x[cf.schgCycodeField],stateChgEntries))}.', file=sys.stderr)
     for t in range(len(cycleEnc)):                                      # For each valid solution, generate Cycle LUT and State Change LUT memory images
-      with open(f"{outdir}/{idx:0{len(str(len(codeGraphs)))}}.{schedIdx:0{len(str(len(schedCycleLUTs)))}}.{t:0{len(str(len(cycleEnc)))}}.clut", "w") as outf:
-        print(genVerilogMem(cycleEnc[t]), file=outf)
-      with open(f"{outdir}/{idx:0{len(str(len(codeGraphs)))}}.{schedIdx:0{len(str(len(schedCycleLUTs)))}}.{t:0{len(str(len(cycleEnc)))}}.schg", "w") as outf:
-        print(genVerilogMem(convertStateChgToBinary(stateChgSolutions[t])), file=outf)
+      imgname = f"{idx:0{len(str(len(codeGraphs)))}}.{schedIdx:0{len(str(len(schedCycleLUTs)))}}.{t:0{len(str(len(cycleEnc)))}}"
+      imagearchive.write(outdir, f"{imgname}.clut", genVerilogMem(cycleEnc[t]) + '\n')  # Identical images of different solutions are stored once if archive enabled
+      imagearchive.write(outdir, f"{imgname}.schg", genVerilogMem(convertStateChgToBinary(stateChgSolutions[t])) + '\n')
   if cf.debugStdErr:
     print(topoSchedules[idx], file=sys.stderr)
+
+imagearchive.close(outdir, report=cf.debugStdErr)
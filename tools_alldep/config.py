@@ -22,6 +22,7 @@ constraintISALen = 16
 constraintStepGroups = 6
 constraintCycleLUTLen = 21
 constraintImemNibbles = 480
+constraintEarlyChecks = True  # Discard candidates, covers and cycle orders violating step groups or IMEM nibbles as soon as they appear (sets2slack2cover.py, cover2code.py)
 
 # VANAGA config (imported as sub-package in some tools, for opcode encoding optimization)
 bitlength = 4
@@ -31,6 +32,56 @@ mutation_rate = 0.85
 tracked_fitness = 'min_metric'  # min_metric or max_metric
 best_individuals_number = 2  # Choose percentage of elitism population
 fitness_remove_immediates = False  # Should immediate values in IMEM stream be considered?
+fitness_vectorized = True  # cycles2openc.py: Score whole population per generation with NumPy from symbol transition counts of IMEM stream, identical scores (False: one individual at a time)
+
+## DDG permutation generation from AST input (ast2ddgs.py)
+ddgStreamOutput = True  # Write each DDG permutation to its output file as soon as it is generated (constant memory)
+ddgDedupPermutations = True  # Only emit one representative DDG of permutations with identical dependency edges (see <app>.manifest)
+ddgSampleBudget = None  # Only draw this number of DDG permutations from the full cross product (None: generate all)
+ddgSampleSeed = 0  # Seed for drawing DDG permutations
+ddgSampleMode = 'uniform'  # uniform or stratified (each permutation of each basic block drawn equally often)
+
+## Pipeline driver (ddgs2codes.py)
+pipelineWorkers = None  # Maximum number of concurrently running pipeline jobs (None: number of CPUs)
+pipelineJobTimeout = None  # Seconds after which a job is signaled to deliver its current solutions (None: no timeout)
+pipelineJobGrace = 60  # Seconds a signaled job may still take to deliver before it is killed
+pipelineLogFile = 'ddgs2codes.log'  # Aggregated log of all pipeline jobs
+
+## Wall-clock budget and checkpoints of search stages (sets2slack2cover.py, cover2code.py)
+searchTimeBudget = None  # Seconds after which a stage delivers its current solutions like on SIGUSR1 (None: no budget)
+checkpointDir = None  # Directory for checkpoints of search state and current best solutions (None: no checkpoints)
+checkpointInterval = 60  # Seconds between periodic checkpoints
+checkpointResume = True  # Resume from an existing checkpoint of a run with the same input and configuration
+
+## Instruction candidate search (ddg2sets.py)
+convexInstrSearch = True  # Enumerate candidates directly as convex node sets of the DDG (False: walk all topological sorts)
+compactNodeSets = True  # Represent node sets of a basic block as integer bitmasks in candidate search and exact cover (ddg2sets.py, sets2slack2cover.py)
+coverLowerBound = True  # Compact mode: prune exact cover search by lower bound of instructions needed for uncovered nodes (sets2slack2cover.py)
+uniquifyBranchAndBound = True  # Find covers with fewest unique instructions by global branch-and-bound (False: recursion with bounds local to each basic block)
+uniquifyWorkers = 1  # Branch-and-bound: Number of worker processes searching subtrees in parallel (1: serial search with checkpoints)
+uniquifySplitDepth = 2  # Branch-and-bound: Number of first basic blocks with several covers (most-constrained first) whose cover combinations form the parallel subtrees
+coverSolver = 'enum'  # enum (enumerate shortest covers, then uniquify) or ilp (select covers with fewest unique instructions jointly as ILP, needs PuLP with CBC)
+ilpMaxSolutions = 16  # ILP mode: Maximum number of optimal program covers (with slack) delivered to downstream processing
+ilpTimeLimit = None  # ILP mode: Time limit in seconds for each solver call (None: no limit)
+compactCoverOutput = True  # sets2slack2cover.py output holds each distinct pattern graph once, covers reference it by index (cover2code.py reads both formats)
+
+## Store of per-basic-block results and Cycle LUT assemblies shared by pipelines (ddg2sets.py, sets2slack2cover.py, cover2code.py)
+blockStoreDir = '../blockstore'  # Directory of content-addressed candidates, shortest covers and assemblies, relative to working directory (ZZ_* directories share their parent; None: disabled)
+
+## Cycle LUT assembly (cover2code.py, code2streams.py)
+cLUTAssembler = 'scs'  # scs (all shortest assemblies by subset DP over exact string overlaps) or recursive (pairwise overlap-and-merge recursion)
+cLUTCombinationBound = True  # Evaluate cycle order combinations by ascending lower bound of Cycle LUT length and stop when bound exceeds best length (with slack)
+cLUTOrderSearch = True  # Find orders of assembled strings with lowest maximum base address by memoized search over remaining strings (False: evaluate all permutations)
+cLUTOrderMaxSolutions = None  # Keep only the first n orders with lowest maximum base address (None: all)
+cLUTAssemblyCache = True  # Memoize shortest assemblies by sorted multiset of encoded strings (persisted in store of per-basic-block results if enabled)
+
+## Topological schedules of code graphs (cover2code.py)
+scheduleTopK = None  # Keep only k schedules of lowest cost for each code graph, selected without enumerating all schedules (None: all schedules)
+scheduleCost = 'hamming'  # hamming (Hamming distance of consecutive opcode nibbles in IMEM fetch stream) or nibbles (IMEM nibbles incl. immediate arguments, same for all schedules: first k)
+
+## Generated images (code2streams.py, asm2mem.py, imagearchive.py, code2images.sh, coSimulateISA.sh, images2*.sh)
+nativeAssembler = True  # asm2mem.py: Assemble all schedules in-process with macros of header and .incdef, bit-exact to axasm (False: run axasm once per schedule)
+imageArchive = None  # File name of single-file archive of all .clut, .schg and .mem images (each distinct image stored once, indexed with sizes) within output directory, e.g. 'images.db' (None: one file per image)
 
 ## DSE slack
 slackBBDict = {}
@@ -21,14 +21,21 @@ import tempfile
 import ast
 import time
 import signal
+import heapq
 import networkx as nx
 from networkx.drawing.nx_pydot import write_dot
 from networkx.readwrite import json_graph
 import config as cf
 import func_match as funcMatch
+import blockstore
+import checkpoint
 
 
 run = True                                                              # Global semaphor: Should we still run?
+assemblyCache = {}                                                      # Memoized shortest Cycle LUT assemblies: sorted multiset of encoded strings -> sorted assemblies
+assemblyStats = {'hits' : 0, 'storeHits' : 0, 'misses' : 0}
+constraintRejects = {'stepGroups' : 0, 'cycleLUTLen' : 0}              # Number of cycle order combinations rejected by constraint checks
+boundCache = {}                                                         # Lower bounds of shortest assembly length: sorted multiset of encoded strings -> bound
 
 def handlerSolutionsNow(signum,frame):                                  # Signal Handler: Deliver current solutions now and abort recursion
   global run
@@ -77,6 +84,94 @@ def assemble(prev_str_list):                                            # Recurs
 ## ---
 
 
+def overlap(string,candidate):                                          # Auxiliary Function: Length of longest proper overlap of end of string with beginning of candidate
+  for n in reversed(range(1,min(len(string),len(candidate)))):
+    if string[-n:] == candidate[:n]:
+      return n
+  return 0
+
+def reduceStrings(strList):                                             # Auxiliary Function: Sorted distinct strings not contained in others (identical and contained strings are covered for free)
+  strings = sorted({tuple(string) for string in strList})
+  return [s for s in strings if not any(s != t and contains(s,t) for t in strings)]
+
+def lowerBound(strList):                                                # Auxiliary Function: Admissible lower bound of shortest assembly length
+  strings = reduceStrings(strList)
+  if len(strings) < 2:
+    return sum([len(s) for s in strings])
+  ov = [[overlap(s,t) if s != t else 0 for t in strings] for s in strings]
+  maxOut = [max(row) for row in ov]                                     # Each string overlaps at most one successor and at most one predecessor, the last string of an assembly has no successor
+  maxIn = [max(col) for col in zip(*ov)]
+  saving = min(sum(maxOut) - min(maxOut), sum(maxIn) - min(maxIn))
+  return max(sum([len(s) for s in strings]) - saving, max([len(s) for s in strings]))
+
+def assembleSCS(strList):                                               # Assemble Cycle LUT entries into all shortest assemblies (shortest common superstring by subset DP over overlap graph)
+  strings = reduceStrings(strList)
+  n = len(strings)
+  if n == 0:
+    return {frozenset()}
+  ov = [[overlap(s,t) for t in strings] for s in strings]               # Exact overlaps, an optimal assembly overlaps consecutive strings maximally (strings are substring-free)
+  full = (1 << n) - 1
+  rest = [None] * (1 << n)                                              # rest[mask][last]: Minimum length still to append if strings in mask are placed and last string placed is last
+  rest[full] = [0] * n
+  for mask in reversed(range(1,full)):
+    rest[mask] = [None] * n
+    for last in range(n):
+      if mask & (1 << last):
+        rest[mask][last] = min(len(strings[j]) - ov[last][j] + rest[mask | (1 << j)][j] for j in range(n) if not mask & (1 << j))
+  best = min(len(strings[j]) + rest[1 << j][j] for j in range(n))
+
+  memo = {}
+  def completions(mask,last):                                           # All optimal completions: (continuation of current string, set of further strings); no overlap starts a new string
+    if mask == full:
+      return {((), frozenset())}
+    if (mask, last) not in memo:
+      result = set()
+      for j in range(n):
+        if not mask & (1 << j) and len(strings[j]) - ov[last][j] + rest[mask | (1 << j)][j] == rest[mask][last]:
+          for suffix, others in completions(mask | (1 << j), j):
+            if ov[last][j] > 0:
+              result.add((strings[j][ov[last][j]:] + suffix, others))
+            else:
+              result.add(((), others.union({strings[j] + suffix})))
+      memo[(mask, last)] = result
+    return memo[(mask, last)]
+
+  output = set()
+  for j in range(n):
+    if len(strings[j]) + rest[1 << j][j] == best:
+      output.update(others.union({strings[j] + suffix}) for suffix, others in completions(1 << j, j))
+  return output
+
+
+def cachedAssemble(encStrList):                                         # Auxiliary Function: Shortest assemblies of encoded string list, memoized in process and in store
+  key = tuple(sorted(tuple(string) for string in encStrList))           # Assembly only depends on multiset of encoded strings, not on instruction order
+  if key in assemblyCache:
+    assemblyStats['hits'] += 1
+  else:
+    storeKey = blockstore.valueKey((cf.cLUTAssembler, key))
+    assemblies = blockstore.load('assembly',storeKey)                   # Reuse assemblies computed by an earlier run or any pipeline
+    if assemblies is None:
+      assemblyStats['misses'] += 1
+      if cf.cLUTAssembler == 'scs':
+        assembled = assembleSCS(key)
+      else:
+        assembled = assemble([list(string) for string in key])
+      minLength = min([sum([len(t) for t in s]) for s in assembled])
+      assemblies = sorted(sorted(s) for s in assembled if sum([len(t) for t in s]) == minLength)
+      blockstore.save('assembly',storeKey,assemblies)
+    else:
+      assemblyStats['storeHits'] += 1
+    assemblyCache[key] = assemblies
+  return [set(s) for s in assemblyCache[key]]                           # Same assembly order whether computed or reused
+
+def cachedLowerBound(encStrList):                                       # Auxiliary Function: Lower bound of shortest assembly length (exact if assembly already memoized)
+  key = tuple(sorted(tuple(string) for string in encStrList))
+  if key in assemblyCache:
+    return sum([len(t) for t in assemblyCache[key][0]])
+  if key not in boundCache:
+    boundCache[key] = lowerBound(key)
+  return boundCache[key]
+
 def encodeStrList(strList):                                             # Auxiliary Function: Encode string list of instruction operations to intermediate cycle LUT mnemonics
   output = []
   for instr in strList:
@@ -93,14 +188,66 @@ def encodeStrList(strList):                                             # Auxili
     output.append(iStr)
   return output
 
-def findAllTopologicalSchedules(bblist,prevList):                       # Auxiliary Function: Find all valid topological schedules of a sequence of basic blocks by recursion
+def findAllTopologicalSchedules(codeG,bblist,prevList):                 # Auxiliary Function: Find all valid topological schedules of a sequence of basic blocks by recursion
   if len(bblist) == 0:
     yield prevList
   else:
     for srt in nx.all_topological_sorts(codeG.subgraph({bblist[0]}.union(nx.descendants(codeG,bblist[0])))):
-      for i in findAllTopologicalSchedules(bblist[1:],prevList+srt):
+      for i in findAllTopologicalSchedules(codeG,bblist[1:],prevList+srt):
         yield i
 
+def countTopologicalSchedules(codeG,bblist):                            # Auxiliary Function: Number of valid topological schedules without enumeration (product of linear extension counts of basic blocks)
+  total = 1
+  for bb in bblist:
+    nodes = sorted({bb}.union(nx.descendants(codeG,bb)))
+    bit = {node : 1 << i for i, node in enumerate(nodes)}
+    predMask = [sum([bit[pred] for pred in codeG.predecessors(node)]) for node in nodes]
+    full = (1 << len(nodes)) - 1
+    memo = {full : 1}
+    def count(placed):                                                  # Linear extensions of nodes not yet placed (memoized over placed down-sets)
+      if placed not in memo:
+        memo[placed] = sum([count(placed | bit[node]) for i, node in enumerate(nodes) if not placed & bit[node] and predMask[i] & placed == predMask[i]])
+      return memo[placed]
+    total *= count(0)
+  return total
+
+def instrCost(nodeattr):                                                # Auxiliary Function: Schedule cost of a single instruction
+  if cf.scheduleCost == 'nibbles':                                      # IMEM nibbles: opcode and one nibble per immediate argument
+    return 1 + (len(nodeattr['imm'].split(',')) if len(nodeattr['imm']) > 0 else 0)
+  return 0
+
+def transCost(prevattr,nodeattr):                                       # Auxiliary Function: Schedule cost of two consecutively fetched instructions
+  if cf.scheduleCost == 'hamming':                                      # Hamming distance of opcode nibbles (PAT index) in IMEM fetch stream
+    return bin(int(prevattr['opcode'].split('_')[1]) ^ int(nodeattr['opcode'].split('_')[1])).count('1')
+  return 0
+
+def selectTopologicalSchedules(codeG,bblist,k):                         # Auxiliary Function: k valid topological schedules of lowest cost (ties: enumeration order), without enumerating all schedules
+  blocks = []
+  for bb in bblist:                                                     # For each basic block, keep k best sorts per first and last instruction (only these affect the cost across blocks)
+    groups = {}
+    for sortIdx, srt in enumerate(nx.all_topological_sorts(codeG.subgraph({bb}.union(nx.descendants(codeG,bb))))):
+      instrs = [node for node in srt if codeG.nodes[node]['opcode'] != 'bb']
+      cost = sum([instrCost(codeG.nodes[node]) for node in instrs]) + sum([transCost(codeG.nodes[i],codeG.nodes[j]) for i, j in zip(instrs,instrs[1:])])
+      ends = (instrs[0], instrs[-1]) if len(instrs) > 0 else None
+      heap = groups.setdefault(ends, [])
+      heapq.heappush(heap, (-cost, -sortIdx, srt))                      # Bounded max-heap: drop worst sort once more than k are kept
+      if len(heap) > k:
+        heapq.heappop(heap)
+    blocks.append([(-cost, -sortIdx, srt, ends) for ends, heap in groups.items() for cost, sortIdx, srt in heap])
+  states = {None : [(0, (), [])]}                                       # k best partial schedules per last instruction: (cost, sort indices of blocks, schedule)
+  for cands in blocks:
+    newStates = {}
+    for last, partials in states.items():
+      for cost, idxs, sched in partials:
+        for sortCost, sortIdx, srt, ends in cands:
+          if ends is None:                                              # Block without instructions: last instruction unchanged
+            newStates.setdefault(last, []).append((cost + sortCost, idxs + (sortIdx,), sched + srt))
+          else:
+            trans = transCost(codeG.nodes[last],codeG.nodes[ends[0]]) if last is not None else 0
+            newStates.setdefault(ends[1], []).append((cost + trans + sortCost, idxs + (sortIdx,), sched + srt))
+    states = {last : heapq.nsmallest(k, partials, key=lambda x: x[:2]) for last, partials in newStates.items()}
+  return [sched for cost, idxs, sched in heapq.nsmallest(k, [p for partials in states.values() for p in partials], key=lambda x: x[:2])]
+
 def validCycleOrders(pat):                                              # Auxiliary Function: Yield all valid cycle orders within a single pattern node
   for order in nx.all_topological_sorts(pat):                           # Iterate through all topological orders of single node pattern graph
     for node in order[1:]:
@@ -118,52 +265,69 @@ def validISACombinations(gList):                                        # Auxili
         yield [j] + i
 
 
-argc = len(sys.argv)
-if argc > 1:
-  f = open(sys.argv[1])
-else:
-  f = tempfile.TemporaryFile('w+')
-  f.write(sys.stdin.read())
-  f.seek(0)
-
-header, depG, coverList, graphList = ast.literal_eval(f.read())
-depG = json_graph.node_link_graph(depG)
-graphList = [[json_graph.node_link_graph(j) for j in i] for i in graphList]
-f.close()
-
-
-validISAList = [list(validISACombinations(i)) for i in graphList]       # Pass 1: Collect lists of all valid ISA combinations for each cover in graph list
-validISAStrings = [[[[graphList[i][j].nodes[node]['opcode'] for node in pat] for j,pat in enumerate(comb)] for comb in isa] for i,isa in enumerate(validISAList)]
-bblist = []
-for node in sorted(depG.nodes,key=lambda x: str(x).rjust(len(str(len(depG.nodes))))):
-  if len(nx.ancestors(depG,node)) == 0:
-    bblist.append(node)                                                 # Collect all basic block start nodes in dependency graph (no ancestors!)
-
-
-signal.signal(signal.SIGUSR1, handlerSolutionsNow)                      # Register signal handlers for global semaphor
-signal.signal(signal.SIGUSR2, handlerSolutionsNow)
-bestLUTCovers = []
-bestLUTStringLists = []
-bestLUTAssemblies = []
-bestLUTLength = None
-for coveridx, coverISAStringCombs in enumerate(validISAStrings):        # Pass 2: Evaluate which covers have shortest Cycle LUT length
-  if not run:                                                           # Check global semaphor if we should still iterate
-    break
-  for strList in coverISAStringCombs:                                   # For each valid cycle order of each instruction in ISA:
-    if not run:                                                         # Check global semaphor if we should still iterate
+def cover2code(header,depG,coverList,graphList):                        # Stage Function: Select covers with shortest Cycle LUT and derive code graphs and schedules
+  validISAList = [list(validISACombinations(i)) for i in graphList]     # Pass 1: Collect lists of all valid ISA combinations for each cover in graph list
+  validISAStrings = [[[[graphList[i][j].nodes[node]['opcode'] for node in pat] for j,pat in enumerate(comb)] for comb in isa] for i,isa in enumerate(validISAList)]
+  bblist = []
+  for node in sorted(depG.nodes,key=lambda x: str(x).rjust(len(str(len(depG.nodes))))):
+    if len(nx.ancestors(depG,node)) == 0:
+      bblist.append(node)                                               # Collect all basic block start nodes in dependency graph (no ancestors!)
+
+  signal.signal(signal.SIGUSR1, handlerSolutionsNow)                    # Register signal handlers for global semaphor
+  signal.signal(signal.SIGUSR2, handlerSolutionsNow)
+  checkpoint.startBudget(handlerSolutionsNow)
+  ckptKey = checkpoint.inputKey('cover2code',header,depG,coverList,graphList,cf.cycleLUTNames,cf.cLUTRemoveInnerIMEMCycles,cf.cLUTAssembler,cf.cLUTCombinationBound,cf.constraintEarlyChecks,cf.constraintStepGroups,cf.constraintCycleLUTLen,cf.slackCycleLUTLen)
+  ckptState = checkpoint.load('cover2code',ckptKey)                    # Resume from checkpoint of an interrupted run with same input (if existing)
+  if ckptState is None:
+    ckptState = {'pos' : 0, 'combs' : [], 'covers' : [], 'strLists' : [], 'assemblies' : [], 'length' : None}
+  bestLUTCombs = ckptState['combs']
+  bestLUTCovers = ckptState['covers']
+  bestLUTStringLists = ckptState['strLists']
+  bestLUTAssemblies = ckptState['assemblies']
+  bestLUTLength = ckptState['length']
+  stopPos = None
+  encStrLists = [[encodeStrList(strList) for strList in coverISAStringCombs] for coverISAStringCombs in validISAStrings]  # Encode cycle LUT entries to intermediate mnemonics
+  combOrder = [(coveridx, combidx) for coveridx, coverEncStrLists in enumerate(encStrLists) for combidx in range(len(coverEncStrLists))]
+  if cf.constraintEarlyChecks:                                          # Discard cycle order combinations exceeding Cycle LUT step groups before assembly
+    feasible = [comb for comb in combOrder if max([len(enc) for enc in encStrLists[comb[0]][comb[1]]], default=0) <= cf.constraintStepGroups]
+    constraintRejects['stepGroups'] += len(combOrder) - len(feasible)
+    combOrder = feasible
+  if cf.cLUTCombinationBound:                                           # Evaluate cycle order combinations by ascending lower bound of Cycle LUT length (good incumbents first)
+    combBounds = {comb : cachedLowerBound(encStrLists[comb[0]][comb[1]]) for comb in combOrder}
+    combOrder.sort(key=lambda comb: (combBounds[comb], comb))
+  boundPruned = 0
+  for pos, (coveridx, combidx) in enumerate(combOrder):                 # Pass 2: Evaluate which covers (with which cycle order of each instruction in ISA) have shortest Cycle LUT length
+    if pos < ckptState['pos']:                                          # Skip cycle order combinations already evaluated before checkpoint
+      continue
+    if not run and bestLUTLength is not None:                           # Check global semaphor if we should still iterate (anytime: not before first solution)
+      stopPos = pos
       break
-    encStrList = encodeStrList(strList)                                 # Encode cycle LUT entries to intermediate mnemonics
-    assembledStrings = [{j for j in i} for i in assemble(encStrList)]   # Assemble, i.e., overlap and merge, the cycle LUT entries (mnemonics!) of each instruction (microcode-style)
+    if cf.cLUTCombinationBound and bestLUTLength is not None:           # Lower bound cannot beat best length (with slack) or LUT constraint: neither can all remaining combinations
+      if combBounds[(coveridx, combidx)] > min(bestLUTLength + cf.slackCycleLUTLen, cf.constraintCycleLUTLen):
+        boundPruned = len(combOrder) - pos
+        break
+    if checkpoint.due():                                                # Periodic checkpoint: position of next cycle order combination and current best solutions
+      checkpoint.save('cover2code',ckptKey,{'pos' : pos, 'combs' : bestLUTCombs, 'covers' : bestLUTCovers, 'strLists' : bestLUTStringLists, 'assemblies' : bestLUTAssemblies, 'length' : bestLUTLength})
+    strList = validISAStrings[coveridx][combidx]
+    encStrList = encStrLists[coveridx][combidx]
+    if cf.cLUTAssemblyCache:                                            # Assemble, i.e., overlap and merge, the cycle LUT entries (mnemonics!) of each instruction (microcode-style)
+      assembledStrings = cachedAssemble(encStrList)
+    elif cf.cLUTAssembler == 'scs':
+      assembledStrings = [{j for j in i} for i in assembleSCS(encStrList)]
+    else:
+      assembledStrings = [{j for j in i} for i in assemble(encStrList)]
     minLUTLength = min([sum([len(t) for t in s]) for s in assembledStrings])
     if bestLUTLength is not None:                                       # Only keep the best/shortest solutions (with parameterizable slack) - if a new minimum is achieved, non-minimum solutions are cleared from further consideration
       if minLUTLength > (bestLUTLength + cf.slackCycleLUTLen):
         continue
       elif minLUTLength > cf.constraintCycleLUTLen:
+        constraintRejects['cycleLUTLen'] += 1
         continue
       elif minLUTLength < bestLUTLength:                                # If a new lowest Cycle LUT length is achieved, prune solutions with parameterizable slack
         prunePtr = 0
         while prunePtr < len(bestLUTCovers):
           if min([sum([len(t) for t in s]) for s in bestLUTAssemblies[prunePtr]]) > (minLUTLength + cf.slackCycleLUTLen):
+            bestLUTCombs.pop(prunePtr)
             bestLUTCovers.pop(prunePtr)
             bestLUTStringLists.pop(prunePtr)
             bestLUTAssemblies.pop(prunePtr)
@@ -172,6 +336,7 @@ for coveridx, coverISAStringCombs in enumerate(validISAStrings):        # Pass 2
         bestLUTLength = minLUTLength
     else:
       bestLUTLength = minLUTLength
+    bestLUTCombs.append((coveridx, combidx))
     bestLUTCovers.append(coveridx)                                      # In the end, bestLUTCovers contains the cover index of shortest Cycle LUT solutions
     for s in assembledStrings.copy():
       if sum([len(t) for t in s]) > minLUTLength:
@@ -184,53 +349,105 @@ for coveridx, coverISAStringCombs in enumerate(validISAStrings):        # Pass 2
       print(assembledStrings, file=sys.stderr)
       print(f'{time.strftime("%Y-%m-%d %H:%M:%S")} - Cover {coveridx}: Minimum CW LUT length is {minLUTLength}.', file=sys.stderr)
 
+  if cf.cLUTCombinationBound:                                           # Deliver solutions in order of covers and cycle order combinations (independent of evaluation order)
+    ranks = sorted(range(len(bestLUTCombs)), key=lambda i: bestLUTCombs[i])
+    bestLUTCombs[:] = [bestLUTCombs[i] for i in ranks]
+    bestLUTCovers[:] = [bestLUTCovers[i] for i in ranks]
+    bestLUTStringLists[:] = [bestLUTStringLists[i] for i in ranks]
+    bestLUTAssemblies[:] = [bestLUTAssemblies[i] for i in ranks]
+    if cf.debugStdErr:
+      print(f'{boundPruned} of {len(combOrder)} cycle order combinations pruned by lower bound of Cycle LUT length.', file=sys.stderr)
+  if cf.debugStdErr and cf.constraintEarlyChecks:
+    print(f'Rejected by constraints: {constraintRejects["stepGroups"]} cycle order combinations (step groups), {constraintRejects["cycleLUTLen"]} (Cycle LUT length).', file=sys.stderr)
+  checkpoint.stopBudget()
+  if cf.debugStdErr and cf.cLUTAssemblyCache:
+    lookups = assemblyStats['hits'] + assemblyStats['storeHits'] + assemblyStats['misses']
+    print(f'Cycle LUT assembly cache: {lookups} lookups, {assemblyStats["hits"]} hits, {assemblyStats["storeHits"]} store hits, {assemblyStats["misses"]} assembled ({100*(lookups-assemblyStats["misses"])/max(lookups,1):.1f} % reused).', file=sys.stderr)
+  if stopPos is not None:                                               # Iteration aborted: checkpoint position where it stopped, else checkpoint is not needed anymore
+    checkpoint.save('cover2code',ckptKey,{'pos' : stopPos, 'combs' : bestLUTCombs, 'covers' : bestLUTCovers, 'strLists' : bestLUTStringLists, 'assemblies' : bestLUTAssemblies, 'length' : bestLUTLength})
+  else:
+    checkpoint.remove('cover2code',ckptKey)
+
+  bestCodeGraphs = []
+  topoSchedules = []
+  patternKeys = {}                                                      # Canonical pattern keys of pattern graphs (shared between covers)
+  for idx in bestLUTCovers:                                             # Pass 3: Generate code graph for each shortest instruction cover with fewest unique instructions and shortest Cycle LUT entries
+    cover = coverList[idx]
+    codeG = depG.copy()                                                 # Derive pattern-matched code graph from dependency graph
+    patternIdx = {}
+    for newOp, subg in enumerate(graphList[idx]):                       # Registry of canonical pattern keys of unique instructions
+      if id(subg) not in patternKeys:
+        patternKeys[id(subg)] = funcMatch.pattern_key(subg)
+      patternIdx.setdefault(patternKeys[id(subg)], newOp)
+    for cut in cover:                                                   # For each node cut in instruction cover:
+      newOp = patternIdx[funcMatch.pattern_key(depG.subgraph(cut))]     # Match cut to graph number in list of unique instructions
+      edgesToAdd = []
+      nodesToDelete = []
+      tgtNode = cut[-1]                                                 # To maintain topological ordering, the resulting pattern node must have highest node number of cut (last in cut list)
+      tgtImm = codeG.nodes[tgtNode]['imm']
+      for node in cut[0:-1]:                                            # To collapse all other nodes into resulting pattern node, analyze dependencies and derive nodesToDelete and edgesToAdd
+        nodesToDelete.append(node)
+        for pred in codeG.predecessors(node):
+          if pred not in cut:
+            edgesToAdd.append((pred,tgtNode))
+        for succ in codeG.successors(node):
+          if succ not in cut:
+            edgesToAdd.append((tgtNode,succ))
+        imm = codeG.nodes[node]['imm']
+        if len(imm) > 0:                                                # also derive target immediate (if applicable) - only one immediate value currently allowed
+          tgtImm = imm
+      codeG.remove_nodes_from(nodesToDelete)                            # Finally, remove nodes and add edges to collapse cut into single pattern node
+      codeG.add_edges_from(edgesToAdd)
+      codeG.nodes[tgtNode].clear()                                      # Update attribute dict with pattern opcode and original node information
+      codeG.nodes[tgtNode]['opcode'] = f'PAT_{newOp:0{len(str(len(graphList[idx])))}}'
+      codeG.nodes[tgtNode]['orignodes'] = cut
+      codeG.nodes[tgtNode]['imm'] = tgtImm                              # Update with immediate value if applicable
+    bestCodeGraphs.append(codeG)
+    if cf.scheduleTopK is None:
+      topoSchedules.append(list(findAllTopologicalSchedules(codeG,bblist,[])))
+    else:                                                               # Only keep k best schedules by selected cost
+      topoSchedules.append(selectTopologicalSchedules(codeG,bblist,cf.scheduleTopK))
+    if cf.debugStdErr:
+      print(f'Cover {idx}: {countTopologicalSchedules(codeG,bblist)} valid topological schedules, {len(topoSchedules[-1])} passed to downstream processing.', file=sys.stderr)
+    #if cf.debugStdErr:
+    #  print(cover, file=sys.stderr)
+    #  print(validISAList[idx], file=sys.stderr)
+    #  print(validISAStrings[idx], file=sys.stderr)
+    #  for pat in graphList[idx]:
+    #    write_dot(pat, sys.stderr)
+    #  for sched in topoSchedules[-1]:
+    #    print(sched, file=sys.stderr)
+    #  write_dot(bestCodeGraphs[-1], sys.stderr)
+
+  if cf.debugStdErr:
+    if run:
+      print(f'{len(bestLUTCovers)} Best LUT Covers (with slack {cf.slackCycleLUTLen}) passed to downstream processing.', file=sys.stderr)
+    else:
+      print(f'{len(bestLUTCovers)} LUT Covers passed to downstream processing AFTER ABORTING ITERATION.', file=sys.stderr)
+
+  return header, bestLUTStringLists, bestLUTAssemblies, bestCodeGraphs, topoSchedules
 
-bestCodeGraphs = []
-topoSchedules = []
-for idx in bestLUTCovers:                                               # Pass 3: Generate code graph for each shortest instruction cover with fewest unique instructions and shortest Cycle LUT entries
-  cover = coverList[idx]
-  codeG = depG.copy()                                                   # Derive pattern-matched code graph from dependency graph
-  for cut in cover:                                                     # For each node cut in instruction cover:
-    for newOp, subg in enumerate(graphList[idx]):                       # Match cut to graph number in list of unique instructions
-      if nx.is_isomorphic(depG.subgraph(cut),subg,node_match=funcMatch.node_match):
-        break                                                           # When matched, for-loop breaks and number is contained in newOp
-    edgesToAdd = []
-    nodesToDelete = []
-    tgtNode = cut[-1]                                                   # To maintain topological ordering, the resulting pattern node must have highest node number of cut (last in cut list)
-    tgtImm = codeG.nodes[tgtNode]['imm']
-    for node in cut[0:-1]:                                              # To collapse all other nodes into resulting pattern node, analyze dependencies and derive nodesToDelete and edgesToAdd
-      nodesToDelete.append(node)
-      for pred in codeG.predecessors(node):
-        if pred not in cut:
-          edgesToAdd.append((pred,tgtNode))
-      for succ in codeG.successors(node):
-        if succ not in cut:
-          edgesToAdd.append((tgtNode,succ))
-      imm = codeG.nodes[node]['imm']
-      if len(imm) > 0:                                                  # also derive target immediate (if applicable) - only one immediate value currently allowed
-        tgtImm = imm
-    codeG.remove_nodes_from(nodesToDelete)                              # Finally, remove nodes and add edges to collapse cut into single pattern node
-    codeG.add_edges_from(edgesToAdd)
-    codeG.nodes[tgtNode].clear()                                        # Update attribute dict with pattern opcode and original node information
-    codeG.nodes[tgtNode]['opcode'] = f'PAT_{newOp:0{len(str(len(graphList[idx])))}}'
-    codeG.nodes[tgtNode]['orignodes'] = cut
-    codeG.nodes[tgtNode]['imm'] = tgtImm                                # Update with immediate value if applicable
-  bestCodeGraphs.append(codeG)
-  topoSchedules.append(list(findAllTopologicalSchedules(bblist,[])))
-  #if cf.debugStdErr:
-  #  print(cover, file=sys.stderr)
-  #  print(validISAList[idx], file=sys.stderr)
-  #  print(validISAStrings[idx], file=sys.stderr)
-  #  for pat in graphList[idx]:
-  #    write_dot(pat, sys.stderr)
-  #  for sched in topoSchedules[-1]:
-  #    print(sched, file=sys.stderr)
-  #  write_dot(bestCodeGraphs[-1], sys.stderr)
-
-if cf.debugStdErr:
-  if run:
-    print(f'{len(bestLUTCovers)} Best LUT Covers (with slack {cf.slackCycleLUTLen}) passed to downstream processing.', file=sys.stderr)
+
+if __name__ == '__main__':
+  argc = len(sys.argv)
+  if argc > 1:
+    f = open(sys.argv[1])
+  else:
+    f = tempfile.TemporaryFile('w+')
+    f.write(sys.stdin.read())
+    f.seek(0)
+
+  coverData = ast.literal_eval(f.read())
+  if len(coverData) == 5:                                               # Compact input: table of distinct patterns, per-cover lists of indices into table (graphs shared between covers)
+    header, depG, coverList, patternTable, patternRefs = coverData
+    patternTable = [json_graph.node_link_graph(j) for j in patternTable]
+    graphList = [[patternTable[j] for j in i] for i in patternRefs]
   else:
-    print(f'{len(bestLUTCovers)} LUT Covers passed to downstream processing AFTER ABORTING ITERATION.', file=sys.stderr)
+    header, depG, coverList, graphList = coverData
+    graphList = [[json_graph.node_link_graph(j) for j in i] for i in graphList]
+  depG = json_graph.node_link_graph(depG)
+  f.close()
+
+  header, bestLUTStringLists, bestLUTAssemblies, bestCodeGraphs, topoSchedules = cover2code(header,depG,coverList,graphList)
 
-print(repr((header,bestLUTStringLists,bestLUTAssemblies,[json_graph.node_link_data(g) for g in bestCodeGraphs],topoSchedules)))
+  print(repr((header,bestLUTStringLists,bestLUTAssemblies,[json_graph.node_link_data(g) for g in bestCodeGraphs],topoSchedules)))
@@ -10,6 +10,7 @@
 import sys
 import tempfile
 import ast
+from collections import Counter
 import config as cf
 
 
@@ -19,27 +20,53 @@ def dstHamming(str1, str2):
   return sum(c1 != c2 for c1, c2 in zip(str1, str2))
 
 
-argc = len(sys.argv)
-if argc > 1:
-  f = open(sys.argv[1])
-else:
-  f = tempfile.TemporaryFile('w+')
-  f.write(sys.stdin.read())
-  f.seek(0)
+def cycleLUTAddresses(iMemCycleList, cLutCycleList):                    # Auxiliary Function: Sequence of Cycle LUT addresses in NanoController CU
+  cList = []
+  for iMem, cLut in zip(iMemCycleList, cLutCycleList):
+    cList.extend(list(range(cLut[0],cLut[0]+len(iMem)-1)))              # - in REGFETCH state
+    cList.extend(cLut)                                                  # - in EXECUTE state
+    cList.append(cLut[0])                                               # - in FETCH state of next instruction
+  return cList
 
-iMemCycleList, cLutCycleList, xtraCycleList = ast.literal_eval(f.read())
-f.close()
+def hammingTrace(iMemCycleList, cLutCycleList):                         # Accumulated Hamming distance of Cycle LUT address trace
+  cList = cycleLUTAddresses(iMemCycleList, cLutCycleList)
+  if any(i >> cf.schgLUTBaseAddrBits for i in cList):                   # Address wider than base address field: compare binary strings, Hamming distance up to length of shorter one
+    cListStr = [f'{i:0{cf.schgLUTBaseAddrBits}b}' for i in cList]
+    return sum(dstHamming(cListStr[i], cListStr[i+1]) for i in range(len(cList)-1))
+  return sum((i ^ j).bit_count() for i, j in zip(cList, cList[1:]))     # Toggles between consecutive addresses by XOR and popcount
 
+def bbTransitions(bbTrace, nonEmpty):                                   # Visits of and transitions between basic blocks with instructions in trace (weights for hammingBBTrace)
+  trace = [i for i in bbTrace if nonEmpty[i]]
+  return Counter(trace), Counter(zip(trace, trace[1:]))
 
-cList = []
-for iMem, cLut in zip(iMemCycleList, cLutCycleList):                    # Build up sequence of Cycle LUT addresses in NanoController CU:
-  cList.extend(list(range(cLut[0],cLut[0]+len(iMem)-1)))                # - in REGFETCH state
-  cList.extend(cLut)                                                    # - in EXECUTE state
-  cList.append(cLut[0])                                                 # - in FETCH state of next instruction
+def hammingBBTrace(iMemPerBB, cLutPerBB, bbTrace, transitions=None):    # Accumulated Hamming distance of Cycle LUT address trace from basic blocks (equals hammingTrace of expanded cycle lists)
+  cListPerBB = [cycleLUTAddresses(iMem, cLut) for iMem, cLut in zip(iMemPerBB, cLutPerBB)]
+  if any(i >> cf.schgLUTBaseAddrBits for cList in cListPerBB for i in cList):
+    iMemCycleList = [iMem for i in bbTrace for iMem in iMemPerBB[i]]
+    cLutCycleList = [cLut for i in bbTrace for cLut in cLutPerBB[i]]
+    return hammingTrace(iMemCycleList, cLutCycleList)
+  if transitions is None:
+    transitions = bbTransitions(bbTrace, [len(cList) > 0 for cList in cListPerBB])
+  visits, edges = transitions
+  hamming = 0
+  for i, count in visits.items():                                       # Toggles within basic blocks, weighted with number of visits ...
+    cList = cListPerBB[i]
+    hamming += count * sum((a ^ b).bit_count() for a, b in zip(cList, cList[1:]))
+  for (i, j), count in edges.items():                                   # ... plus toggles from last address of a basic block to first address of its successor
+    hamming += count * (cListPerBB[i][-1] ^ cListPerBB[j][0]).bit_count()
+  return hamming
 
-cListStr = [f'{i:0{cf.schgLUTBaseAddrBits}b}' for i in cList]           # Convert trace of Cycle LUT addresses to list of binary strings, ...
-hamming = 0
-for i in range(len(cList)-1):                                           # ... then accumulate Hamming distances within sequence
-  hamming += dstHamming(cListStr[i], cListStr[i+1])
 
-print(hamming)
+if __name__ == '__main__':
+  argc = len(sys.argv)
+  if argc > 1:
+    f = open(sys.argv[1])
+  else:
+    f = tempfile.TemporaryFile('w+')
+    f.write(sys.stdin.read())
+    f.seek(0)
+
+  iMemCycleList, cLutCycleList, xtraCycleList = ast.literal_eval(f.read())
+  f.close()
+
+  print(hammingTrace(iMemCycleList, cLutCycleList))
@@ -15,6 +15,7 @@ import time
 import numpy as np  # use numpy due to array structure, code simplicity and performance
 import csv
 from itertools import chain
+from collections import Counter
 import config as cf
 
 # Imports from VANAGA
@@ -43,14 +44,67 @@ def evalHamming(iMemCycleList, chromoKeys, individual):                 # Auxili
     hamming += dstHamming(strList[i], strList[i+1])
   return hamming
 
+popcountTable = np.array([bin(i).count('1') for i in range(256)], dtype=np.int64)
+prefixMask = np.array([((1 << i) - 1) << (64 - i) for i in range(65)], dtype=np.uint64)
+
+def packBits(strList):                                                  # Auxiliary Function: Binary strings as left-aligned 64 bit integers with string lengths (None if not binary or too long)
+  strList = np.ascontiguousarray(strList)
+  if strList.dtype.kind != 'U' or strList.dtype.itemsize // 4 > 64:
+    return None
+  width = strList.dtype.itemsize // 4
+  codes = strList.view(np.uint32).reshape(*strList.shape, width)        # Characters as code points, padded with zeros
+  lengths = np.char.str_len(strList)
+  if np.any((np.arange(width) < lengths[..., None]) & (codes != ord('0')) & (codes != ord('1'))):
+    return None
+  bits = (codes == ord('1')).astype(np.uint64) << np.arange(63, 63 - width, -1, dtype=np.uint64)
+  return np.bitwise_or.reduce(bits, axis=-1), lengths
+
+def transitionCounts(iMemCycleList, chromoKeys):                        # Auxiliary Function: Symbol transitions in IMEM stream with counts (symbols: opcode keys by index, then distinct immediates)
+  keyIndex = {key : i for i, key in enumerate(chromoKeys)}
+  immediates = {}
+  symbols = []
+  for i in iMemCycleList:
+    if i in keyIndex:
+      symbols.append(keyIndex[i])
+    elif not cf.fitness_remove_immediates:
+      symbols.append(len(chromoKeys) + immediates.setdefault(i, len(immediates)))
+  packed = packBits(np.array(list(immediates), dtype=str))
+  if packed is None:
+    return None                                                         # Immediates not binary: evaluate individuals one by one
+  transitions = Counter(zip(symbols, symbols[1:]))
+  pairs = np.array(list(transitions), dtype=np.intp).reshape(-1, 2)
+  counts = np.array(list(transitions.values()), dtype=np.int64)
+  return packed + (pairs, counts)
+
+def evalHammingPopulation(population, transitions):                     # Auxiliary Function: Accumulated Hamming distances of all individuals at once (None if encodings not binary)
+  packed = packBits(np.array([list(individual) for individual in population]))
+  if packed is None or packed[0].ndim != 2:
+    return None
+  immValues, immLengths, pairs, counts = transitions
+  values = np.concatenate((packed[0], np.broadcast_to(immValues, (len(population), len(immValues)))), axis=1)
+  lengths = np.concatenate((packed[1], np.broadcast_to(immLengths, (len(population), len(immLengths)))), axis=1)
+  src, dst = pairs[:, 0], pairs[:, 1]
+  common = np.minimum(lengths[:, src], lengths[:, dst])                 # Compare up to length of shorter string like dstHamming
+  diff = (values[:, src] ^ values[:, dst]) & prefixMask[common]
+  toggles = 0
+  for i in range(0, 64, 8):                                             # Popcount bytewise by table
+    toggles = toggles + popcountTable[(diff >> np.uint64(i)) & np.uint64(0xFF)]
+  return toggles @ counts
+
 def fitness(iMemCycleList, chromoKeys, population, \
-hamming_over_gen, best_fitness_metric_ISE_over_gen):                    # Auxiliary Function: Calculate fitness (accumulated Hamming distances) of currently evolved population
+hamming_over_gen, best_fitness_metric_ISE_over_gen, transitions=None):  # Auxiliary Function: Calculate fitness (accumulated Hamming distances) of currently evolved population
   hamming_results = []
   best_fitness_metric_ISE = []
+  hammingPopulation = None
+  if transitions is not None:
+    hammingPopulation = evalHammingPopulation(population, transitions)  # Evaluate whole population from precomputed symbol transitions
   for i in range(len(population)):
     population[i] = list(population[i])
     best_fitness_metric_ISE.append(population[i])                       # Track the evaluated ISE
-    hamming = evalHamming(iMemCycleList, chromoKeys, population[i])     # Get accumulated Hamming distance for individual
+    if hammingPopulation is not None:
+      hamming = int(hammingPopulation[i])
+    else:
+      hamming = evalHamming(iMemCycleList, chromoKeys, population[i])   # Get accumulated Hamming distance for individual
     hamming_results.append(hamming)                                     # Add to the result progress array
     population[i] = np.array(population[i])
   population = np.array(population)
@@ -94,9 +148,12 @@ chromoKeys = list(opSet)                                                # Build
 chromoLen = len(chromoKeys)
 population = create_starting_population(cf.population_size, chromoLen)  # VANAGA: Initialize starting population
 population = list(population)                                           # Transform population and scores to use append
+transitions = None
+if cf.fitness_vectorized:
+  transitions = transitionCounts(iMemCycleList, chromoKeys)             # Count symbol transitions once for all generations
 
 scores, hamming_over_gen, best_fitness_metric_ISE_over_gen = fitness(iMemCycleList, chromoKeys, population, \
-hamming_over_gen, best_fitness_metric_ISE_over_gen)                     # Evaluate fitness of initial population
+hamming_over_gen, best_fitness_metric_ISE_over_gen, transitions)        # Evaluate fitness of initial population
 
 for generation in range(cf.maximum_generation):                         # Generation Evaluation Loop
   if cf.debugStdErr:
@@ -130,7 +187,7 @@ for generation in range(cf.maximum_generation):                         # Genera
   population = list(population)                                         # convert to list in order to use python methods not included in numpy arrays
   scores = list(scores)
   scores, hamming_over_gen, best_fitness_metric_ISE_over_gen = fitness(iMemCycleList, chromoKeys, population, \
-  hamming_over_gen, best_fitness_metric_ISE_over_gen)                   # Evaluate fitness of currently evolved population
+  hamming_over_gen, best_fitness_metric_ISE_over_gen, transitions)      # Evaluate fitness of currently evolved population
   gens = np.arange(1, generation + 2, 1)                                # Write CSVs of evolutionary process
   with open(f'openc_results_total.{cover}.{cf.tracked_fitness}.csv', mode='w') as results_total_file:
     fieldnames = ['Generation', 'HD']
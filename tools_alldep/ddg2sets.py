@@ -22,58 +22,111 @@ import ast
 import networkx as nx
 from networkx.readwrite import json_graph
 import config as cf
+import blockstore
 
 
-def recInstrSearch(prevSched,prevSchedList,isa):                        # Auxiliary Function: Recursively search valid instructions from topologically sorted schedules
+def recInstrSearch(depG,prevSched,prevSchedList,isa,bit=None):          # Auxiliary Function: Recursively search valid instructions from topologically sorted schedules
   schedDict = {}
   for sched in prevSchedList:                                           # for each still-possible schedule tail
     if len(sched) > 0:                                                  # Abortion criterion: no schedule tail
-      curSched = frozenset(prevSched.union({sched[0]}))                 # update instruction pattern from schedule tail, concatenate all resource uses
-      if '#' in depG.nodes[sched[0]]['use'] and len(prevSched) > 0:     # Skip criterion: if immediate not first node in instruction, this is currently not allowed - skip current pattern candidate
+      if bit is not None:                                               # update instruction pattern from schedule tail, concatenate all resource uses
+        curSched = prevSched | bit[sched[0]]                            # (compact mode: pattern is integer bitmask of basic block nodes)
+      else:
+        curSched = frozenset(prevSched.union({sched[0]}))
+      if '#' in depG.nodes[sched[0]]['use'] and prevSched:              # Skip criterion: if immediate not first node in instruction, this is currently not allowed - skip current pattern candidate
         continue
       if curSched not in schedDict:                                     # schedDict will contain as keys all possible instruction patterns on this branch, as value a list of further schedule branching
         schedDict[curSched] = []
       schedDict[curSched].append(sched[1:])
   for key in schedDict:                                                 # for each valid instruction pattern, add it to current ISA candidates and recurse further
     isa.add(key)
-    recInstrSearch(key,schedDict[key],isa)
-
-
-argc = len(sys.argv)
-if argc > 1:
-  f = open(sys.argv[1])
-else:
-  f = tempfile.TemporaryFile('w+')
-  f.write(sys.stdin.read())
-  f.seek(0)
-
-header, blocklist, blockedges = ast.literal_eval(f.read())
-f.close()
-
-
-depG = nx.DiGraph()
-bblist = []
-nodenum = 1
-for block in blocklist:                                                 # Pass 1: Build dependency graph from node and edge lists
-  bblist.append(nodenum)
-  depG.add_nodes_from([(i,elem) for i,elem in enumerate(block,start=nodenum)])
-  nodenum += len(block)
-for block in blockedges:
-  depG.add_edges_from(block)
-
-
-isaList = []
-schedules = [list(nx.all_topological_sorts(depG.subgraph({i}.union(nx.descendants(depG,i))))) for i in bblist]
-for block in schedules:                                                 # Pass 2: Find sets of instructions from all valid topological dependency graph sorts
-  isaList.append(set())
-  schedList = []
-  for sched in block:                                                   # Prepare initial list of still-possible schedule tails (starting from each node in schedule)
-    schedList.extend([sched[i:] for i in range(1,len(sched))])
-  recInstrSearch(frozenset(),schedList,isaList[-1])
-
-
-print(repr((header,json_graph.node_link_data(depG),[[set(i) for i in isa] for isa in isaList])))
-
-if cf.debugStdErr:
-  print([len(i) for i in schedules], file=sys.stderr)
-  print([len(isa) for isa in isaList], file=sys.stderr)
+    recInstrSearch(depG,key,schedDict[key],isa,bit)
+
+
+def convexInstrSearch(depG,bb):                                         # Auxiliary Function: Enumerate all instruction node sets that are contiguous in some topological sort of a basic block
+  nodes = sorted(nx.descendants(depG,bb))                               # Candidate nodes (basic block node itself is never part of an instruction)
+  bit = {node: 1 << i for i, node in enumerate(nodes)}
+  anc = [sum(bit[a] for a in nx.ancestors(depG,node) if a in bit) for node in nodes]
+  desc = [sum(bit[d] for d in nx.descendants(depG,node)) for node in nodes]
+  imm = [('#' in depG.nodes[node]['use']) for node in nodes]
+  found = set()
+  queue = []
+  for i in range(len(nodes)):                                           # Every single node is an instruction candidate
+    found.add(1 << i)
+    queue.append((1 << i, anc[i], desc[i], anc[i] if imm[i] else None))
+  while len(queue) > 0:                                                 # Grow candidates node by node (every valid set is reachable by adding its sinks last)
+    cur, curAnc, curDesc, immAnc = queue.pop()
+    for i in range(len(nodes)):
+      new = cur | (1 << i)
+      if new == cur or new in found:
+        continue
+      if (desc[i] & curAnc & ~new) or (anc[i] & curDesc & ~new):        # Skip criterion: a node outside the set lies on a path between set nodes (never contiguous in a sort)
+        continue
+      if imm[i] and (immAnc is not None or anc[i] & cur):               # Skip criterion: immediate node must be first node in instruction (no other immediate, no ancestor in set)
+        continue
+      if immAnc is not None and immAnc & (1 << i):                      # Skip criterion: new node would precede immediate node of instruction
+        continue
+      found.add(new)
+      queue.append((new, curAnc | anc[i], curDesc | desc[i], anc[i] if imm[i] else immAnc))
+  return {frozenset(node for node in nodes if mask & bit[node]) for mask in found}
+
+
+def ddg2sets(header,blocklist,blockedges):                              # Stage Function: Find candidate instruction node sets for each basic block of a DDG
+  depG = nx.DiGraph()
+  bblist = []
+  nodenum = 1
+  for block in blocklist:                                               # Pass 1: Build dependency graph from node and edge lists
+    bblist.append(nodenum)
+    depG.add_nodes_from([(i,elem) for i,elem in enumerate(block,start=nodenum)])
+    nodenum += len(block)
+  for block in blockedges:
+    depG.add_edges_from(block)
+
+  isaList = []
+  if cf.convexInstrSearch:
+    for bb in bblist:                                                   # Pass 2: Find sets of instructions directly from dependency graph (contiguous in some topological sort)
+      key = blockstore.blockKey(depG,bb)
+      stored = blockstore.load('sets',key)                              # Reuse candidates of identical basic block computed by any pipeline
+      if stored is None:
+        stored = blockstore.relative(convexInstrSearch(depG,bb),bb)
+        blockstore.save('sets',key,stored)
+      isaList.append(set(blockstore.absolute(stored,bb)))               # Same candidate order whether computed or reused
+    if cf.debugStdErr:
+      print([len(nx.descendants(depG,i)) for i in bblist], file=sys.stderr)
+  else:
+    schedules = [list(nx.all_topological_sorts(depG.subgraph({i}.union(nx.descendants(depG,i))))) for i in bblist]
+    for block in schedules:                                             # Pass 2: Find sets of instructions from all valid topological dependency graph sorts
+      isaList.append(set())
+      schedList = []
+      for sched in block:                                               # Prepare initial list of still-possible schedule tails (starting from each node in schedule)
+        schedList.extend([sched[i:] for i in range(1,len(sched))])
+      if cf.compactNodeSets:
+        nodes = sorted(block[0])
+        recInstrSearch(depG,0,schedList,isaList[-1],{node : 1 << i for i,node in enumerate(nodes)})
+        isaList[-1] = {frozenset(node for i,node in enumerate(nodes) if mask >> i & 1) for mask in isaList[-1]}
+      else:
+        recInstrSearch(depG,frozenset(),schedList,isaList[-1])
+    if cf.debugStdErr:
+      print([len(i) for i in schedules], file=sys.stderr)
+
+  if cf.debugStdErr:
+    print([len(isa) for isa in isaList], file=sys.stderr)
+
+  return header, depG, [[set(i) for i in isa] for isa in isaList]
+
+
+if __name__ == '__main__':
+  argc = len(sys.argv)
+  if argc > 1:
+    f = open(sys.argv[1])
+  else:
+    f = tempfile.TemporaryFile('w+')
+    f.write(sys.stdin.read())
+    f.seek(0)
+
+  header, blocklist, blockedges = ast.literal_eval(f.read())
+  f.close()
+
+  header, depG, isaList = ddg2sets(header,blocklist,blockedges)
+
+  print(repr((header,json_graph.node_link_data(depG),isaList)))
@@ -0,0 +1,134 @@
+#!/bin/python3
+## Copyright (c) 2025 Chair for Chip Design for Embedded Computing,
+##                    TU Braunschweig, Germany
+##                    www.tu-braunschweig.de/en/eis
+##
+## Use of this source code is governed by an MIT-style
+## license that can be found in the LICENSE file or at
+## https://opensource.org/licenses/MIT.
+
+## In-process pipeline driver: runs 'ddg2sets | sets2slack2cover | cover2code' (and 'asm2ddg' for ASM inputs)
+## for each input file in a bounded pool of worker processes. Each job is executed in the directory of its
+## input file with the tools (and config) found there, and writes <name>.code and <name>.log next to it.
+
+import os
+import sys
+import ast
+import time
+import signal
+import traceback
+import multiprocessing
+import multiprocessing.connection
+import config as cf
+
+
+stageModules = ['config', 'func_match', 'blockstore', 'checkpoint', 'asm2ddg', 'ddg2sets', 'sets2slack2cover', 'cover2code']
+
+def runJob(path):                                                       # Worker Function: Run complete pipeline for a single DDG/ASM input file
+  jobdir, fname = os.path.split(os.path.abspath(path))
+  name, ext = os.path.splitext(fname)
+  os.chdir(jobdir)                                                      # Use tools and config of job directory (like the shell pipeline does)
+  sys.path.insert(0, jobdir)
+  for mod in stageModules:                                              # Forget modules inherited from the driver process
+    sys.modules.pop(mod, None)
+  log = open(f'{name}.log', 'w', buffering=1)
+  sys.stderr = log                                                      # Stage debugging output goes to job log
+  print(f'== START == {time.strftime("%a %b %d %H:%M:%S %Z %Y")} ==', file=log)
+  try:
+    import ddg2sets
+    import sets2slack2cover
+    import cover2code
+
+    def handlerSolutionsNow(signum,frame):                              # Signal Handler: Forward request to deliver current solutions to all search stages
+      sets2slack2cover.handlerSolutionsNow(signum,frame)
+      cover2code.handlerSolutionsNow(signum,frame)
+
+    signal.signal(signal.SIGUSR1, handlerSolutionsNow)                  # Stages register their own handlers later, until then signals are forwarded
+    signal.signal(signal.SIGUSR2, handlerSolutionsNow)
+    with open(fname) as f:
+      if ext == '.asm':
+        import asm2ddg
+        ddg = asm2ddg.asm2ddg(f)
+      else:
+        ddg = ast.literal_eval(f.read())
+    covers = sets2slack2cover.sets2slack2cover(*ddg2sets.ddg2sets(*ddg))
+    cover2code.run = sets2slack2cover.run                               # Signal already received: also deliver Cycle LUT solutions immediately
+    output = cover2code.cover2code(*covers)
+    header, LUTStringLists, LUTAssemblies, codeGraphs, topoSchedules = output
+    from networkx.readwrite import json_graph
+    with open(f'{name}.code', 'w') as outf:
+      print(repr((header,LUTStringLists,LUTAssemblies,[json_graph.node_link_data(g) for g in codeGraphs],topoSchedules)), file=outf)
+  except Exception:
+    traceback.print_exc(file=log)
+    print(f'== FAILED == {time.strftime("%a %b %d %H:%M:%S %Z %Y")} ==', file=log)
+    log.close()
+    os._exit(1)
+  print(f'== END == {time.strftime("%a %b %d %H:%M:%S %Z %Y")} ==', file=log)
+  log.close()
+  os._exit(0)
+
+
+def appendJobLog(aggLog,path,status,duration):                         # Auxiliary Function: Append job status and job log to aggregated log
+  name = os.path.splitext(path)[0]
+  print(f'=== {path}: {status} after {duration:.1f} s ===', file=aggLog)
+  try:
+    with open(f'{name}.log') as jobLog:
+      aggLog.write(jobLog.read())
+  except OSError:
+    pass
+  aggLog.flush()
+
+
+if __name__ == '__main__':
+  jobs = sys.argv[1:]
+  workers = cf.pipelineWorkers if cf.pipelineWorkers is not None else os.cpu_count()
+  ctx = multiprocessing.get_context('fork')
+
+  aggLog = open(cf.pipelineLogFile, 'a')
+  print(f'== DDGS2CODES START == {time.strftime("%a %b %d %H:%M:%S %Z %Y")} == {len(jobs)} jobs, {workers} workers ==', file=aggLog)
+  pending = list(jobs)
+  running = {}
+  results = {}
+  while len(pending) > 0 or len(running) > 0:
+    while len(pending) > 0 and len(running) < workers:                  # Fill up worker pool
+      path = pending.pop(0)
+      proc = ctx.Process(target=runJob, args=(path,))
+      proc.start()
+      running[proc.sentinel] = {'path' : path, 'proc' : proc, 'start' : time.time(), 'signaled' : False}
+      if cf.debugStdErr:
+        print(f'{time.strftime("%Y-%m-%d %H:%M:%S")} - Started {path}', file=sys.stderr)
+    multiprocessing.connection.wait(list(running.keys()), timeout=1)
+    now = time.time()
+    for sentinel in list(running.keys()):
+      job = running[sentinel]
+      proc = job['proc']
+      duration = now - job['start']
+      if not proc.is_alive():                                           # Job finished: collect exit status and job log
+        proc.join()
+        if proc.exitcode == 0:
+          status = 'DELIVERED AFTER TIMEOUT' if job['signaled'] else 'OK'
+        else:
+          status = f'FAILED (exit code {proc.exitcode})'
+        results[job['path']] = status
+        appendJobLog(aggLog, job['path'], status, duration)
+        if cf.debugStdErr:
+          print(f'{time.strftime("%Y-%m-%d %H:%M:%S")} - Finished {job["path"]}: {status}', file=sys.stderr)
+        running.pop(sentinel)
+      elif cf.pipelineJobTimeout is not None:
+        if not job['signaled'] and duration > cf.pipelineJobTimeout:   # Timeout: request stages to deliver current solutions now
+          os.kill(proc.pid, signal.SIGUSR1)
+          job['signaled'] = True
+        elif job['signaled'] and duration > cf.pipelineJobTimeout + cf.pipelineJobGrace:
+          proc.kill()                                                   # No delivery within grace period: kill job
+          proc.join()
+          results[job['path']] = 'KILLED'
+          appendJobLog(aggLog, job['path'], 'KILLED', duration)
+          running.pop(sentinel)
+
+  failed = [path for path in jobs if results[path] not in ('OK', 'DELIVERED AFTER TIMEOUT')]
+  print(f'== DDGS2CODES END == {time.strftime("%a %b %d %H:%M:%S %Z %Y")} == {len(jobs)-len(failed)} of {len(jobs)} jobs delivered ==', file=aggLog)
+  aggLog.close()
+  if cf.debugStdErr:
+    print(f'{len(jobs)-len(failed)} of {len(jobs)} jobs delivered, see {cf.pipelineLogFile}.', file=sys.stderr)
+  if len(failed) > 0:
+    sys.exit(1)
@@ -7,8 +7,33 @@
 ## license that can be found in the LICENSE file or at
 ## https://opensource.org/licenses/MIT.
 
+import itertools
+
 def node_match(attr1,attr2):                                            # Auxiliary Function: Node match for isomorphism test of dependency subgraphs
   for attr in {'opcode','def','use'}:                                   # Opcode, Def, and Use fields must be identical in order for nodes to match
     if attr1[attr] != attr2[attr]:
       return False
   return True
+
+def node_label(attr):                                                   # Auxiliary Function: Hashable node label with the fields compared by node_match
+  return (attr['opcode'], tuple(sorted(attr['def'])), tuple(sorted(attr['use'])))
+
+def pattern_key(g):                                                     # Auxiliary Function: Canonical label of a pattern graph (equal iff isomorphic with node_match)
+  labels = {node : node_label(g.nodes[node]) for node in g.nodes}
+  ranks = {label : i for i,label in enumerate(sorted(set(labels.values())))}
+  colors = {node : ranks[labels[node]] for node in g.nodes}
+  while True:                                                           # Refine node colors by colors of predecessors and successors until stable
+    sig = {node : (colors[node], tuple(sorted(colors[p] for p in g.predecessors(node))), tuple(sorted(colors[s] for s in g.successors(node)))) for node in g.nodes}
+    ranks = {s : i for i,s in enumerate(sorted(set(sig.values())))}
+    refined = {node : ranks[sig[node]] for node in g.nodes}
+    if len(ranks) == len(set(colors.values())):
+      break
+    colors = refined
+  groups = [[node for node in g.nodes if colors[node] == c] for c in sorted(set(colors.values()))]
+  best = None
+  for order in itertools.product(*[itertools.permutations(group) for group in groups]):
+    pos = {node : i for i,node in enumerate(itertools.chain(*order))} # Exact canonical form: minimal edge list over all orderings within color classes
+    edges = tuple(sorted((pos[u],pos[v]) for u,v in g.edges))
+    if best is None or edges < best:
+      best = edges
+  return tuple(labels[group[0]] for group in groups for node in group), best
@@ -0,0 +1,121 @@
+#!/bin/python3
+## Copyright (c) 2025 Chair for Chip Design for Embedded Computing,
+##                    TU Braunschweig, Germany
+##                    www.tu-braunschweig.de/en/eis
+##
+## Use of this source code is governed by an MIT-style
+## license that can be found in the LICENSE file or at
+## https://opensource.org/licenses/MIT.
+
+## Images of an application output directory (Cycle LUT .clut, State Change LUT .schg, IMEM .mem). If enabled in
+## config, all images are kept in a single SQLite archive within the output directory: each distinct image is stored
+## once by content hash, and an index maps image names (<cover>.<schedule>[.<LUT>].<kind>) to images with their
+## precomputed number of memory entries. Otherwise, every image is a separate file. Shell scripts use the command
+## line interface, which behaves the same for both modes:
+##   imagearchive.py <dir> enabled                  exit status 0 if images are archived
+##   imagearchive.py <dir> add <name>               store image read from stdin
+##   imagearchive.py <dir> cat <name>...            print images
+##   imagearchive.py <dir> list [<pattern>]         print sorted image names matching a shell-style pattern
+##   imagearchive.py <dir> size <name>...           print numbers of memory entries (without address lines)
+##   imagearchive.py <dir> extract <dest> <name>... write images as files to directory dest
+
+import os
+import sys
+import glob
+import fnmatch
+import hashlib
+import sqlite3
+import config as cf
+
+
+connections = {}
+
+def archivePath(outdir):                                                # Auxiliary Function: Archive file of output directory
+  return os.path.join(outdir, cf.imageArchive)
+
+def connect(outdir):                                                    # Auxiliary Function: Open (and create) archive of output directory once per process
+  if outdir not in connections:
+    os.makedirs(outdir, exist_ok=True)
+    con = sqlite3.connect(archivePath(outdir))
+    con.execute('CREATE TABLE IF NOT EXISTS images (hash TEXT PRIMARY KEY, data TEXT, entries INTEGER)')
+    con.execute('CREATE TABLE IF NOT EXISTS names (name TEXT PRIMARY KEY, cover TEXT, sched TEXT, lut TEXT, kind TEXT, hash TEXT)')
+    con.execute('CREATE INDEX IF NOT EXISTS namesIdx ON names (kind, cover, sched, lut)')
+    connections[outdir] = con
+  return connections[outdir]
+
+def countEntries(data):                                                 # Auxiliary Function: Number of memory entries of a Verilog memory image (address lines not counted)
+  return len([word for word in data.split() if word[0] != '@'])
+
+def write(outdir,name,data):                                            # Store image under name
+  if cf.imageArchive is None:
+    os.makedirs(outdir, exist_ok=True)
+    with open(os.path.join(outdir, name), 'w') as f:
+      f.write(data)
+    return
+  con = connect(outdir)
+  key = hashlib.sha256(data.encode()).hexdigest()
+  stem, kind = os.path.splitext(name)
+  fields = stem.split('.') + [None, None]                               # Index fields: cover, schedule and LUT index (golden reference only has a name)
+  con.execute('INSERT OR IGNORE INTO images VALUES (?, ?, ?)', (key, data, countEntries(data)))
+  con.execute('INSERT OR REPLACE INTO names VALUES (?, ?, ?, ?, ?, ?)', (name, fields[0], fields[1], fields[2], kind[1:], key))
+
+def read(outdir,name):                                                  # Load image by name
+  if cf.imageArchive is None:
+    with open(os.path.join(outdir, name)) as f:
+      return f.read()
+  row = connect(outdir).execute('SELECT data FROM images JOIN names USING (hash) WHERE name = ?', (name,)).fetchone()
+  if row is None:
+    raise KeyError(f'{name} not in {archivePath(outdir)}')
+  return row[0]
+
+def size(outdir,name):                                                  # Number of memory entries of image (precomputed in archive)
+  if cf.imageArchive is None:
+    return countEntries(read(outdir,name))
+  row = connect(outdir).execute('SELECT entries FROM images JOIN names USING (hash) WHERE name = ?', (name,)).fetchone()
+  if row is None:
+    raise KeyError(f'{name} not in {archivePath(outdir)}')
+  return row[0]
+
+def names(outdir,pattern='*'):                                          # Sorted image names matching shell-style pattern
+  if cf.imageArchive is None:
+    return sorted(os.path.basename(path) for path in glob.glob(os.path.join(glob.escape(outdir), pattern)))
+  if not os.path.exists(archivePath(outdir)):
+    return []
+  return sorted(fnmatch.filter([row[0] for row in connect(outdir).execute('SELECT name FROM names')], pattern))
+
+def close(outdir,report=False):                                         # Commit and close archive of output directory (report: print number of distinct images)
+  if outdir in connections:
+    con = connections.pop(outdir)
+    if report:
+      imageCount, nameCount = con.execute('SELECT (SELECT COUNT(*) FROM images), (SELECT COUNT(*) FROM names)').fetchone()
+      print(f'[IMAGES] {archivePath(outdir)}: {imageCount} distinct images for {nameCount} names.', file=sys.stderr)
+    con.commit()
+    con.close()
+
+
+if __name__ == '__main__':
+  outdir, command, args = sys.argv[1], sys.argv[2], sys.argv[3:]
+  if command == 'enabled':
+    sys.exit(0 if cf.imageArchive is not None else 1)
+  elif command == 'add':
+    write(outdir, args[0], sys.stdin.read())
+  elif command == 'cat':
+    for name in args:
+      sys.stdout.write(read(outdir,name))
+  elif command == 'list':
+    for name in names(outdir, *args[:1]):
+      print(name)
+  elif command == 'size':
+    print(' '.join(str(size(outdir,name)) for name in args))
+  elif command == 'extract':
+    destdir = args[0]
+    os.makedirs(destdir, exist_ok=True)
+    for name in args[1:]:
+      if cf.imageArchive is None and os.path.samefile(outdir, destdir):
+        continue                                                        # Images already are files in destination
+      with open(os.path.join(destdir, name), 'w') as f:
+        f.write(read(outdir,name))
+  else:
+    print(f'Unknown command {command}.', file=sys.stderr)
+    sys.exit(2)
+  close(outdir)
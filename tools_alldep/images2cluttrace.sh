@@ -8,21 +8,22 @@
 ## https://opensource.org/licenses/MIT.
 
 set -e
+set -o pipefail
 
 for f in $1/*.inc
 do
   cover=$(basename $f .inc)
   
-  for g in $1/$cover.*.mem
+  for g in $(./imagearchive.py $1 list "$cover.*.mem")
   do
     img=$(basename $g .mem)
     
-    for h in $1/$img.*.schg
+    for h in $(./imagearchive.py $1 list "$img.*.schg")
     do
       cl=$(basename $h .schg)
-      cat $g | ./asm2cycles.py $1/$img.asm $1.bbtrace $h $1/$cover.incdef | ./cycles2cluttrace.py > $1/$cl.cluttrace
+      echo "$g $1/$img.asm $1.bbtrace $h $1/$cover.incdef $1/$cl.cluttrace"
     done
     
   done
   
-done
+done | ./asm2cycles.py $1 -
@@ -14,10 +14,11 @@ for f in $1/*.inc
 do
   cover=$(basename $f .inc)
   
-  for g in $1/$cover.*.mem
+  for g in $(./imagearchive.py $1 list "$cover.*.mem")
   do
     img=$(basename $g .mem)
-    cat $g | ./asm2cycles.py $1/$img.asm $1.bbtrace $1/$img.+(0).schg $1/$cover.incdef | ./cycles2openc.py $img
+    h=$(./imagearchive.py $1 list "$img.*.schg" | grep -E '\.0+\.schg$')
+    ./imagearchive.py $1 cat $g | ./asm2cycles.py $1/$img.asm $1.bbtrace <(./imagearchive.py $1 cat $h) $1/$cover.incdef | ./cycles2openc.py $img
   done
   
 done
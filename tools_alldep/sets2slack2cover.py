@@ -10,16 +10,20 @@
 import sys
 import tempfile
 import ast
-import copy
 import time
 import signal
+import itertools
+import multiprocessing
 import networkx as nx
 from networkx.readwrite import json_graph
 import config as cf
 import func_match as funcMatch
+import blockstore
+import checkpoint
 
 
 run = True                                                              # Global semaphor: Should we still run?
+constraintRejects = {'stepGroups' : 0, 'imemNibbles' : 0}                # Number of candidates, basic block covers and program covers rejected by early constraint checks
 
 def handlerSolutionsNow(signum,frame):                                  # Signal Handler: Deliver current solutions now and abort recursion
   global run
@@ -75,13 +79,52 @@ def deselect(X,Y,r,cols):                                               # Auxili
 ## ---
 
 
+def solveCompact(colRows,rowMasks,uncovered,solution=[],maxRowSize=None):  # Auxiliary Function: Algorithm X on integer bitmasks (columns are bits of basic block nodes, rows are candidate masks)
+  if not uncovered:                                                     # No column left: valid solution
+    yield list(solution)
+  else:
+    if len(bestSolution[-1]) > 0:                                       # Conditional Recursion: Same abortion criterion as in Algorithm X above, ...
+      slackBBLength = bestLength
+      if bestLength in cf.slackBBDict:
+        slackBBLength += cf.slackBBDict[bestLength]
+      if maxRowSize is not None:                                        # ... optionally with admissible lower bound of instructions still needed for uncovered nodes
+        if len(solution) + -(-uncovered.bit_count() // maxRowSize) > slackBBLength:
+          return
+      elif len(solution) >= slackBBLength:
+        return
+    bestRows = None
+    cols = uncovered
+    while cols:                                                         # 1. Choose column with minimum number of rows still fitting into uncovered columns
+      low = cols & -cols
+      cols ^= low
+      rows = [r for r in colRows[low.bit_length()-1] if rowMasks[r] & uncovered == rowMasks[r]]
+      if bestRows is None or len(rows) < len(bestRows):
+        bestRows = rows
+        if len(rows) == 0:
+          break
+    for r in bestRows:                                                  # 2./3. Include each such row, 4. covering its columns is a single integer operation
+      solution.append(r)
+      for s in solveCompact(colRows,rowMasks,uncovered & ~rowMasks[r],solution,maxRowSize):
+        yield s
+      solution.pop()
+
+
+def instrNibbles(depG,nodeset):                                         # Auxiliary Function: IMEM nibbles of an instruction (opcode and one nibble per immediate argument)
+  return 1 + sum([len(depG.nodes[node]['imm'].split(',')) for node in nodeset if len(depG.nodes[node]['imm']) > 0])
+
+def minStepGroups(depG,nodeset):                                        # Auxiliary Function: Lower bound of Cycle LUT steps of an instruction in any cycle order
+  steps = [name for node in nodeset for name in cf.cycleLUTNames[depG.nodes[node]['opcode']]]
+  if cf.cLUTRemoveInnerIMEMCycles:                                      # Inner IMEM_CYCLE entries may be removed, depending on cycle order
+    return len([name for name in steps if name != 'IMEM_CYCLE'])
+  return len(steps)
+
 def isLonger(graphList,curShortest):                                    # Auxiliary Function: Return if a graph list is longer than current shortest unique solution (with parameterizable slack)
   if curShortest is not None:
     if len(graphList) > (curShortest + cf.slackUniqueInsts):
       return True
   return False
 
-def recUniquify(uniqueInsts,prevGraphList):                             # Auxiliary Function: Recursively find and uniquify identical instructions via pattern isomorphism
+def recUniquify(uniqueInsts,prevGraphList,uniqueKeys,prevKeys):        # Auxiliary Function: Recursively find and uniquify identical instructions via canonical pattern keys
   global run
   if run:                                                               # Check global semaphor if we should still recur
     if len(uniqueInsts) == 0:
@@ -90,15 +133,14 @@ def recUniquify(uniqueInsts,prevGraphList):                             # Auxili
       curShortest = None
       for count in range(len(uniqueInsts[0])):                          # For all possible permutations of basic block with shortest instruction length:
         curGraphList = prevGraphList.copy()
-        for newG in uniqueInsts[0][count]:                              # Check isomorphism of new graphs of recursion against existing old unique graph list
-          for oldG in prevGraphList:
-            if nx.is_isomorphic(oldG,newG,node_match=funcMatch.node_match):
-              break
-          else:
+        curKeys = prevKeys.copy()
+        for newG, newKey in zip(uniqueInsts[0][count],uniqueKeys[0][count]):  # Look up pattern keys of new graphs of recursion in existing old unique graph list
+          if newKey not in prevKeys:
             curGraphList.append(newG)                                   # Only if not isomorphic to any existing graph in old list, append new graph
+            curKeys.add(newKey)
         if isLonger(curGraphList,curShortest):                          # Skip recursion if new unique graph list already longer than old unique list (no improvement possible)
           continue
-        for perm, graphs in recUniquify(uniqueInsts[1:],curGraphList):  # Recursion
+        for perm, graphs in recUniquify(uniqueInsts[1:],curGraphList,uniqueKeys[1:],curKeys):  # Recursion
           if isLonger(graphs,curShortest):                              # Only return recursive result if not longer than existing results, update shortest unique solution if necessary
             continue
           yield [count] + perm, graphs
@@ -107,124 +149,387 @@ def recUniquify(uniqueInsts,prevGraphList):                             # Auxili
           curShortest = min(curShortest, len(graphs))
 
 
-argc = len(sys.argv)
-if argc > 1:
-  f = open(sys.argv[1])
-else:
-  f = tempfile.TemporaryFile('w+')
-  f.write(sys.stdin.read())
-  f.seek(0)
+def bnbSearch(coverKeys,order,prefix=(),shared=None,stop=None,resume=None,saveState=None):  # Auxiliary Function: Branch-and-bound over cover permutations (below a prefix of covers of first basic blocks in order)
+  global run
+  incumbent = None                                                      # Global incumbent: fewest unique instructions of any complete solution (also shared between parallel workers)
+  solutions = []
+  perm = [None] * len(coverKeys)
+  pos = [None] * len(coverKeys)                                         # Search position: index into cover order of each recursion level
+  stopPath = None
+  if resume is not None:                                                # Resume from checkpoint: continue at search node of path with solutions found before
+    incumbent = resume['incumbent']
+    solutions = [(solPerm, unique) for solPerm, unique in resume['solutions']]
+  prefixKeys = frozenset()
+  for depth, count in enumerate(prefix):
+    perm[order[depth]] = count
+    prefixKeys = prefixKeys | coverKeys[order[depth]][count]
 
-header, depG, isaList = ast.literal_eval(f.read())
-depG = json_graph.node_link_graph(depG)
-f.close()
+  def curIncumbent():
+    if shared is not None and shared.value >= 0 and (incumbent is None or shared.value < incumbent):
+      return shared.value
+    return incumbent
 
+  def lowerBound(depth,curKeys):                                        # Each remaining basic block must add at least the new patterns of its best cover
+    bound = len(curKeys)
+    for bb in order[depth:]:
+      bound = max(bound, len(curKeys) + min(len(keys - curKeys) for keys in coverKeys[bb]))
+    return bound
 
-origISAList = [bbList.copy() for bbList in isaList]
-for bb, isa in enumerate(origISAList):                                  # Pass 0: Pre-condition possible ISA instructions (multi-cycle constraint, immediate nodes needing successor, ldMem needing successor due to CW logic bug)
-  for nodeset in isa:
-    if len(nodeset) > cf.constraintCyclesPerInst:                       # Abort criterion: Pattern length exceeding multi-cycle constraint?
-      isaList[bb].remove(nodeset)
-      continue
-    sg = nx.subgraph(depG,nodeset)
-    for node in nodeset:
-      useAttr = sg.nodes[node]['use']                                   # Abort criterion: Patterns with immediate node not having a successor are discarded
-      opAttr = sg.nodes[node]['opcode']                                 # Abort criterion: Patterns with ldMem node not having a successor are discarded (CW logic bug in NanoController v2)
-      if useAttr == {'#'} or opAttr == 'ldMem':
-        if len([i for i in sg.successors(node)]) == 0:
-          isaList[bb].remove(nodeset)
-          break
-      if cf.constraintSleepSeparate:
-        if opAttr == 'sleep' and len(nodeset) > 1:                      # Abort criterion: Allow sleep only to be an exclusive instruction (improves ISA quality for reference applications)
-          isaList[bb].remove(nodeset)
+  def state(depth):                                                     # Checkpoint state: search node not yet visited, everything before it in depth-first order is done
+    return {'path' : pos[:depth], 'solutions' : solutions, 'incumbent' : incumbent}
+
+  def recurse(depth,curKeys,resumePath):
+    nonlocal incumbent, stopPath
+    if (not run or (stop is not None and stop.value)) and curIncumbent() is not None:  # Check global semaphor if we should still search (anytime: not before first complete solution)
+      if stopPath is None:
+        stopPath = pos[:depth]
+      return
+    if resumePath is None and saveState is not None and checkpoint.due():
+      saveState(state(depth))
+    if depth == len(order):
+      solutions.append((perm.copy(), len(curKeys)))
+      if incumbent is None or len(curKeys) < incumbent:
+        incumbent = len(curKeys)
+        if shared is not None:
+          with shared.get_lock():
+            if shared.value < 0 or incumbent < shared.value:
+              shared.value = incumbent
+      return
+    bb = order[depth]
+    coverOrder = sorted(range(len(coverKeys[bb])), key=lambda i: len(coverKeys[bb][i] - curKeys))  # Covers adding fewest new patterns first
+    start = 0
+    if resumePath is not None and depth < len(resumePath):
+      start = resumePath[depth]
+    for idx in range(start,len(coverOrder)):
+      count = coverOrder[idx]
+      newKeys = curKeys | coverKeys[bb][count]
+      bound = curIncumbent()
+      if bound is not None and lowerBound(depth+1,newKeys) > bound + cf.slackUniqueInsts:
+        continue
+      perm[bb] = count
+      pos[depth] = idx
+      recurse(depth+1,newKeys,resumePath if resumePath is not None and idx == start and depth < len(resumePath) else None)
+
+  if all(len(block) > 0 for block in coverKeys):
+    recurse(len(prefix),prefixKeys,resume['path'] if resume is not None else None)
+  if saveState is not None and stopPath is not None:                    # Search aborted: checkpoint the search node where it stopped
+    pos[:len(stopPath)] = stopPath
+    saveState(state(len(stopPath)))
+  return solutions, incumbent
+
+def bnbWorker(prefix):                                                  # Worker Function: Branch-and-bound below a prefix (search data and shared bound are inherited from parent process)
+  coverKeys, order, shared, stop = bnbShared
+  return bnbSearch(coverKeys,order,prefix,shared,stop)
+
+def bnbUniquify(uniqueInsts,uniqueKeys,resume=None,saveState=None):   # Auxiliary Function: Find all cover permutations with fewest unique instructions (with parameterizable slack) by global branch-and-bound
+  global run, bnbShared
+  coverKeys = [[frozenset(keys) for keys in block] for block in uniqueKeys]
+  order = sorted(range(len(coverKeys)), key=lambda bb: (len(coverKeys[bb]), -min([len(keys) for keys in coverKeys[bb]],default=0)))  # Most-constrained basic blocks first
+  if cf.uniquifyWorkers > 1 and resume is None and len(order) > 0 and all(len(block) > 0 for block in coverKeys):
+    splitDepth = len(order)                                             # Parallel mode: split search tree at first basic blocks with several covers, subtrees are searched by worker processes
+    branching = 0
+    for depth, bb in enumerate(order):
+      if len(coverKeys[bb]) > 1:
+        branching += 1
+        if branching == cf.uniquifySplitDepth:
+          splitDepth = depth + 1
           break
+    prefixes = list(itertools.product(*[range(len(coverKeys[bb])) for bb in order[:splitDepth]]))
+    prefixes.sort(key=lambda prefix: len(frozenset().union(*[coverKeys[order[d]][count] for d, count in enumerate(prefix)])))  # Subtrees with fewest patterns first (early incumbent)
+    ctx = multiprocessing.get_context('fork')
+    bnbShared = (coverKeys, order, ctx.Value('i', -1), ctx.Value('b', 0))  # Shared memory: best unique instruction count of all workers, stop flag
+    solutions = []
+    incumbent = None
+    with ctx.Pool(cf.uniquifyWorkers) as pool:
+      results = pool.imap_unordered(bnbWorker, prefixes)
+      for _ in prefixes:
+        while True:
+          try:
+            subSolutions, subIncumbent = results.next(timeout=1)
+            break
+          except multiprocessing.TimeoutError:
+            if not run:                                                 # Forward request to deliver current solutions to workers
+              bnbShared[3].value = 1
+        solutions.extend(subSolutions)
+        if subIncumbent is not None and (incumbent is None or subIncumbent < incumbent):
+          incumbent = subIncumbent
+  else:
+    solutions, incumbent = bnbSearch(coverKeys,order,resume=resume,saveState=saveState)
+  for solPerm, unique in sorted(solutions):                             # Deliver in the same order as recUniquify (basic blocks in input order)
+    if unique > incumbent + cf.slackUniqueInsts:
+      continue
+    graphs = []
+    seen = set()
+    for bb, count in enumerate(solPerm):                                # Unique instructions in order of first occurrence (like recUniquify)
+      for g, key in zip(uniqueInsts[bb][count],uniqueKeys[bb][count]):
+        if key not in seen:
+          seen.add(key)
+          graphs.append(g)
+    yield solPerm, graphs
 
 
-X = []
-Y = []
-bestSolution = []
-for bb, isa in enumerate(isaList):                                      # Pass 1: Find shortest instruction covers for each basic block ISA
-  X.append(set())
-  for cand in isa:                                                      # Universe X is all nodes in BB that can be covered by ISA
-    X[-1].update(cand)
-  Y.append({i : list(j) for i,j in enumerate(isa)})                     # Y is basic block ISA dictionary
-  X[-1] = {j : set() for j in X[-1]}                                    # Reshape the input X according to:
-  for i in Y[-1]:                                                       # https://www.cs.mcgill.ca/~aassaf9/python/algorithm_x.html
-    for j in Y[-1][i]:
-      X[-1][j].add(i)
-  bestSolution.append([])
-  bestLength = 0
-  for cover in solve(X[-1],Y[-1]):                                      # Iteratively solve Algorithm X to find shortest instruction covers
-    if len(bestSolution[-1]) == 0:
-      bestLength = len(cover)
-    bestLength = min(bestLength, len(cover))
-    bestSolution[-1].append(cover)
-  origBestSolution = bestSolution[-1].copy()
-  slackBBLength = bestLength
-  if bestLength in cf.slackBBDict:
-    slackBBLength += cf.slackBBDict[bestLength]
-  for cover in origBestSolution:                                        # Prune solutions to shortest instruction cover (with parameterizable slack)
-    if len(cover) > slackBBLength:
-      bestSolution[-1].remove(cover)
-  if cf.debugStdErr:
-    print(X[-1], file=sys.stderr)
-    print(Y[-1], file=sys.stderr)
-    print(bestSolution[-1], file=sys.stderr)
-    print(f'BB {bb}: There are {len(bestSolution[-1])} Shortest Instruction Covers (min. {bestLength}, max. {slackBBLength} instructions) with max. {cf.constraintCyclesPerInst} cycles per instruction.', file=sys.stderr)
-
-
-uniqueInsts = []
-for bb, block in enumerate(bestSolution):                               # Pass 2: Find number of unique instructions for each shortest basic block instruction cover
-  uniqueInsts.append([])
-  for cover in block:                                                   # Analyze for each cover permutation with shortest instruction length
-    uniqueInsts[-1].append([])
-    subGraphList = []
-    for subg in cover:                                                  # Collect dependency subgraphs of instructions in match to identify identical patterns via isomorphism
-      subGraphList.append(depG.subgraph(Y[bb][subg]))                   # Generate flattened list of all dependency subgraphs of instructions
-    while len(subGraphList) > 0:                                        # As long as there are still instructions to be matched:
-      tmpGraph = subGraphList.pop(0)                                    # - Get one instruction
-      tmpGraphList = subGraphList.copy()
-      for subg in tmpGraphList:                                         # - Match with each other still existing instruction
-        if nx.is_isomorphic(tmpGraph,subg,node_match=funcMatch.node_match):
-          subGraphList.remove(subg)                                     # - If matching, remove match from subgraph list
-      uniqueInsts[-1][-1].append(tmpGraph)                              # - When all duplicates are removed, append instruction to unique list
-
-
-signal.signal(signal.SIGUSR1, handlerSolutionsNow)                      # Register signal handlers for global semaphor
-signal.signal(signal.SIGUSR2, handlerSolutionsNow)
-bestCovers = []
-bestGraphs = []
-bestUnique = 0
-iterCnt = 0
-for perm, graphs in recUniquify(uniqueInsts,[]):                        # Pass 3: Iteratively generate total program covers with lowest number of unique instructions (with parameterizable slack)
-  if len(bestGraphs) == 0:
-    bestUnique = len(graphs)
-  if len(graphs) < bestUnique:                                          # If a new lowest number of unique instructions is achieved, prune bestCovers / bestGraphs with parameterizable slack
-    bestUnique = len(graphs)
-    prunePtr = 0
-    while prunePtr < len(bestCovers):
-      if len(bestGraphs[prunePtr]) > (bestUnique + cf.slackUniqueInsts):
-        bestCovers.pop(prunePtr)
-        bestGraphs.pop(prunePtr)
+def ilpUniquify(depG,X,Y):                                              # Auxiliary Function: Select covers of all basic blocks jointly via ILP with fewest unique instructions (same results as recUniquify)
+  global run
+  try:
+    import pulp                                                         # Optional dependency, only needed for coverSolver = 'ilp'
+  except ImportError:
+    sys.exit("[ERROR] coverSolver = 'ilp' requires PuLP with its bundled CBC solver (pip install pulp).")
+  solver = pulp.PULP_CBC_CMD(msg=False, timeLimit=cf.ilpTimeLimit)
+
+  classes = {}                                                          # Pass A: Group all candidates of all basic blocks into isomorphism classes
+  candClass = []
+  for bb in range(len(Y)):
+    candClass.append({})
+    for i in Y[bb]:
+      key = funcMatch.pattern_key(depG.subgraph(Y[bb][i]))
+      if key not in classes:
+        classes[key] = len(classes)
+      candClass[-1][i] = classes[key]
+
+  prob = pulp.LpProblem('uniqueInsts', pulp.LpMinimize)
+  x = [{i : pulp.LpVariable(f'x_{bb}_{i}', cat='Binary') for i in Y[bb]} for bb in range(len(Y))]
+  u = [pulp.LpVariable(f'u_{k}', cat='Binary') for k in range(len(classes))]
+  for bb in range(len(Y)):                                              # Pass B: Shortest instruction cover of each basic block (with parameterizable slack)
+    bbProb = pulp.LpProblem(f'shortestCover_{bb}', pulp.LpMinimize)
+    bbProb += pulp.lpSum(x[bb].values())
+    for node in X[bb]:
+      bbProb += pulp.lpSum(x[bb][i] for i in X[bb][node]) == 1
+    bbProb.solve(solver)
+    bestLength = round(pulp.value(bbProb.objective) or 0)
+    slackBBLength = bestLength
+    if bestLength in cf.slackBBDict:
+      slackBBLength += cf.slackBBDict[bestLength]
+    for node in X[bb]:                                                  # Joint problem: exact cover of each basic block ...
+      prob += pulp.lpSum(x[bb][i] for i in X[bb][node]) == 1
+    prob += pulp.lpSum(x[bb].values()) <= slackBBLength                 # ... with shortest instruction covers only ...
+    for i in Y[bb]:
+      prob += x[bb][i] <= u[candClass[bb][i]]                           # ... where each selected candidate uses its isomorphism class
+  prob += pulp.lpSum(u)                                                 # Objective: number of unique instructions
+
+  solCnt = 0
+  while run and solCnt < cf.ilpMaxSolutions:                            # Pass C: Iteratively deliver optimal solutions (with parameterizable slack)
+    if prob.solve(solver) != pulp.LpStatusOptimal:
+      break
+    if solCnt == 0:
+      prob += pulp.lpSum(u) <= round(pulp.value(prob.objective)) + cf.slackUniqueInsts
+    perm = []
+    graphs = []
+    seen = set()
+    chosen = []
+    for bb in range(len(Y)):
+      cover = [i for i in Y[bb] if pulp.value(x[bb][i]) > 0.5]
+      chosen.extend(x[bb][i] for i in cover)
+      if cover not in bestSolution[bb]:
+        bestSolution[bb].append(cover)
+      perm.append(bestSolution[bb].index(cover))
+      for i in cover:                                                   # Unique instructions in order of first occurrence (like recUniquify)
+        if candClass[bb][i] not in seen:
+          seen.add(candClass[bb][i])
+          graphs.append(depG.subgraph(Y[bb][i]))
+    prob += pulp.lpSum(chosen) <= len(chosen) - 1                       # Exclude this solution in next iteration
+    solCnt += 1
+    yield perm, graphs
+
+
+def sets2slack2cover(header,depG,isaList):                               # Stage Function: Find shortest instruction covers with fewest unique instructions
+  global bestSolution, bestLength
+  ckptKey = checkpoint.inputKey('sets2slack2cover',header,depG,isaList,cf.constraintCyclesPerInst,cf.constraintSleepSeparate,cf.constraintEarlyChecks,cf.constraintStepGroups,cf.constraintImemNibbles,cf.slackBBDict,cf.slackUniqueInsts)
+  ckptState = checkpoint.load('sets2slack2cover',ckptKey)              # Resume from checkpoint of an interrupted run with same input (if existing)
+  if ckptState is None:
+    ckptState = {'pass1' : [], 'pass3' : None}
+  pass1 = ckptState['pass1']
+  checkpoint.startBudget(handlerSolutionsNow)
+  origISAList = [bbList.copy() for bbList in isaList]
+  for bb, isa in enumerate(origISAList):                                # Pass 0: Pre-condition possible ISA instructions (multi-cycle constraint, immediate nodes needing successor, ldMem needing successor due to CW logic bug)
+    for nodeset in isa:
+      if len(nodeset) > cf.constraintCyclesPerInst:                     # Abort criterion: Pattern length exceeding multi-cycle constraint?
+        isaList[bb].remove(nodeset)
+        continue
+      if cf.constraintEarlyChecks and minStepGroups(depG,nodeset) > cf.constraintStepGroups:
+        isaList[bb].remove(nodeset)                                     # Abort criterion: Pattern exceeding Cycle LUT step groups in every cycle order?
+        constraintRejects['stepGroups'] += 1
+        continue
+      sg = nx.subgraph(depG,nodeset)
+      for node in nodeset:
+        useAttr = sg.nodes[node]['use']                                 # Abort criterion: Patterns with immediate node not having a successor are discarded
+        opAttr = sg.nodes[node]['opcode']                               # Abort criterion: Patterns with ldMem node not having a successor are discarded (CW logic bug in NanoController v2)
+        if useAttr == {'#'} or opAttr == 'ldMem':
+          if len([i for i in sg.successors(node)]) == 0:
+            isaList[bb].remove(nodeset)
+            break
+        if cf.constraintSleepSeparate:
+          if opAttr == 'sleep' and len(nodeset) > 1:                    # Abort criterion: Allow sleep only to be an exclusive instruction (improves ISA quality for reference applications)
+            isaList[bb].remove(nodeset)
+            break
+
+  X = []
+  Y = []
+  bestSolution = []
+  bblist = sorted(node for node in depG.nodes if depG.in_degree(node) == 0)
+  for bb, isa in enumerate(isaList):                                    # Pass 1: Find shortest instruction covers for each basic block ISA
+    X.append(set())
+    for cand in isa:                                                    # Universe X is all nodes in BB that can be covered by ISA
+      X[-1].update(cand)
+    Y.append({i : list(j) for i,j in enumerate(isa)})                   # Y is basic block ISA dictionary
+    X[-1] = {j : set() for j in X[-1]}                                  # Reshape the input X according to:
+    for i in Y[-1]:                                                     # https://www.cs.mcgill.ca/~aassaf9/python/algorithm_x.html
+      for j in Y[-1][i]:
+        X[-1][j].add(i)
+    bestSolution.append([])
+    if cf.coverSolver == 'ilp':                                         # ILP mode: shortest covers are selected jointly in Pass 3
+      continue
+    key = blockstore.blockKey(depG,bblist[bb],(blockstore.relative(isa,bblist[bb]),cf.slackBBDict))
+    if bb < len(pass1):                                                 # Reuse shortest covers of checkpoint or of identical basic block computed by any pipeline
+      stored = pass1[bb]
+    else:
+      stored = blockstore.load('cover',key)
+    if stored is None:
+      bestLength = 0
+      if cf.compactNodeSets:                                            # Compact mode: renumber basic block nodes to bits, candidates become integer bitmasks
+        bit = {node : 1 << i for i,node in enumerate(sorted(X[-1]))}
+        rowMasks = {i : sum(bit[node] for node in j) for i,j in Y[-1].items()}
+        if cf.coverLowerBound:                                          # Lower bound pruning: try large candidates first to find short covers early
+          colRows = [sorted(X[-1][node], key=lambda i: -rowMasks[i].bit_count()) for node in sorted(X[-1])]
+          covers = solveCompact(colRows,rowMasks,sum(bit.values()),[],max([len(j) for j in Y[-1].values()],default=1))
+        else:
+          colRows = [sorted(X[-1][node]) for node in sorted(X[-1])]
+          covers = solveCompact(colRows,rowMasks,sum(bit.values()))
       else:
-        prunePtr += 1
-  bestCovers.append([])                                                 # Append recent found solution to lists for downstream passing, remove original source line & immediate values
-  bestGraphs.append([copy.deepcopy(i) for i in graphs])
-  for g in bestGraphs[-1]:
-    for node in g.nodes:
-      g.nodes[node].pop('srcline')
-      g.nodes[node].pop('imm')
-  for bb, permidx in enumerate(perm):
-    bestCovers[-1].extend([sorted(Y[bb][i],key=lambda x: str(x).rjust(len(str(len(depG.nodes))))) for i in bestSolution[bb][permidx]])
+        covers = solve(X[-1],Y[-1])
+      for cover in covers:                                              # Iteratively solve Algorithm X to find shortest instruction covers
+        if len(bestSolution[-1]) == 0:
+          bestLength = len(cover)
+        bestLength = min(bestLength, len(cover))
+        bestSolution[-1].append(cover)
+      origBestSolution = bestSolution[-1].copy()
+      slackBBLength = bestLength
+      if bestLength in cf.slackBBDict:
+        slackBBLength += cf.slackBBDict[bestLength]
+      for cover in origBestSolution:                                    # Prune solutions to shortest instruction cover (with parameterizable slack)
+        if len(cover) > slackBBLength:
+          bestSolution[-1].remove(cover)
+      stored = (bestLength, slackBBLength, sorted(blockstore.relative([Y[-1][cand] for cand in cover],bblist[bb]) for cover in bestSolution[-1]))
+      blockstore.save('cover',key,stored)
+    if bb == len(pass1):
+      pass1.append(stored)
+      if checkpoint.due():
+        checkpoint.save('sets2slack2cover',ckptKey,{'pass1' : pass1, 'pass3' : None})
+    bestLength, slackBBLength, storedCovers = stored                    # Same cover order whether computed or reused
+    candIdx = {frozenset(j) : i for i,j in Y[-1].items()}
+    bestSolution[-1] = [[candIdx[cand] for cand in blockstore.absolute(cover,bblist[bb])] for cover in storedCovers]
+    if cf.debugStdErr:
+      print(X[-1], file=sys.stderr)
+      print(Y[-1], file=sys.stderr)
+      print(bestSolution[-1], file=sys.stderr)
+      print(f'BB {bb}: There are {len(bestSolution[-1])} Shortest Instruction Covers (min. {bestLength}, max. {slackBBLength} instructions) with max. {cf.constraintCyclesPerInst} cycles per instruction.', file=sys.stderr)
+
+  if cf.constraintEarlyChecks and cf.coverSolver != 'ilp':              # Discard basic block covers exceeding IMEM size even with shortest covers of all other basic blocks
+    coverNibbles = [[sum([instrNibbles(depG,Y[bb][i]) for i in cover]) for cover in block] for bb, block in enumerate(bestSolution)]
+    minNibbles = sum([min(nibbles, default=0) for nibbles in coverNibbles])
+    for bb, block in enumerate(bestSolution):
+      feasible = [cover for cover, nibbles in zip(block,coverNibbles[bb]) if minNibbles - min(coverNibbles[bb], default=0) + nibbles <= cf.constraintImemNibbles]
+      constraintRejects['imemNibbles'] += len(block) - len(feasible)
+      bestSolution[bb] = feasible
+    if cf.debugStdErr:
+      print(f'Minimum IMEM size is {minNibbles} nibbles (constraint {cf.constraintImemNibbles}).', file=sys.stderr)
+
+  uniqueInsts = []
+  uniqueKeys = []
+  for bb, block in enumerate(bestSolution):                             # Pass 2: Find number of unique instructions for each shortest basic block instruction cover
+    uniqueInsts.append([])
+    uniqueKeys.append([])
+    candKeys = {}
+    for cover in block:                                                 # Analyze for each cover permutation with shortest instruction length
+      uniqueInsts[-1].append([])
+      uniqueKeys[-1].append([])
+      for subg in cover:                                                # Identify identical patterns via canonical pattern key (isomorphism)
+        if subg not in candKeys:
+          candKeys[subg] = funcMatch.pattern_key(depG.subgraph(Y[bb][subg]))
+        if candKeys[subg] not in uniqueKeys[-1][-1]:                    # Only first instruction of each pattern is appended to unique list
+          uniqueInsts[-1][-1].append(depG.subgraph(Y[bb][subg]))
+          uniqueKeys[-1][-1].append(candKeys[subg])
+
+  signal.signal(signal.SIGUSR1, handlerSolutionsNow)                    # Register signal handlers for global semaphor
+  signal.signal(signal.SIGUSR2, handlerSolutionsNow)
+  bestCovers = []
+  bestGraphs = []
+  patterns = {}                                                         # Pattern table: node set of instruction in depG -> stripped pattern graph shared by all solutions using it
+  bestUnique = 0
+  iterCnt = 0
+  if cf.coverSolver == 'ilp':
+    solutions = ilpUniquify(depG,X,Y)
+  elif cf.uniquifyBranchAndBound:
+    solutions = bnbUniquify(uniqueInsts,uniqueKeys,ckptState['pass3'],lambda state: checkpoint.save('sets2slack2cover',ckptKey,{'pass1' : pass1, 'pass3' : state}))
+  else:
+    solutions = recUniquify(uniqueInsts,[],uniqueKeys,set())
+  for perm, graphs in solutions:                                        # Pass 3: Iteratively generate total program covers with lowest number of unique instructions (with parameterizable slack)
+    if cf.constraintEarlyChecks:                                        # Discard program covers exceeding IMEM size
+      if sum([instrNibbles(depG,Y[bb][i]) for bb, permidx in enumerate(perm) for i in bestSolution[bb][permidx]]) > cf.constraintImemNibbles:
+        constraintRejects['imemNibbles'] += 1
+        continue
+    if len(bestGraphs) == 0:
+      bestUnique = len(graphs)
+    if len(graphs) < bestUnique:                                        # If a new lowest number of unique instructions is achieved, prune bestCovers / bestGraphs with parameterizable slack
+      bestUnique = len(graphs)
+      prunePtr = 0
+      while prunePtr < len(bestCovers):
+        if len(bestGraphs[prunePtr]) > (bestUnique + cf.slackUniqueInsts):
+          bestCovers.pop(prunePtr)
+          bestGraphs.pop(prunePtr)
+        else:
+          prunePtr += 1
+    bestCovers.append([])                                               # Append recent found solution to lists for downstream passing, remove original source line & immediate values
+    for g in graphs:
+      nodeset = frozenset(g.nodes)
+      if nodeset not in patterns:                                       # Copy of pattern subgraph only (deep copy of a subgraph view copies the whole dependency graph), once per pattern
+        patterns[nodeset] = g.copy()
+        for node in patterns[nodeset].nodes:
+          patterns[nodeset].nodes[node].pop('srcline')
+          patterns[nodeset].nodes[node].pop('imm')
+    bestGraphs.append([patterns[frozenset(g.nodes)] for g in graphs])
+    for bb, permidx in enumerate(perm):
+      bestCovers[-1].extend([sorted(Y[bb][i],key=lambda x: str(x).rjust(len(str(len(depG.nodes))))) for i in bestSolution[bb][permidx]])
+    if cf.debugStdErr:
+      print(f'{time.strftime("%Y-%m-%d %H:%M:%S")} - {iterCnt}: {bestCovers[-1]}: {len(bestCovers[-1])} Total Instructions, {len(bestGraphs[-1])} Unique Instructions.', file=sys.stderr)
+      iterCnt += 1
+
+  checkpoint.stopBudget()
+  if cf.debugStdErr and cf.constraintEarlyChecks:
+    print(f'Rejected by constraints: {constraintRejects["stepGroups"]} candidates (step groups), {constraintRejects["imemNibbles"]} covers (IMEM nibbles).', file=sys.stderr)
+  if run:                                                               # Search completed: checkpoint is not needed anymore
+    checkpoint.remove('sets2slack2cover',ckptKey)
   if cf.debugStdErr:
-    print(f'{time.strftime("%Y-%m-%d %H:%M:%S")} - {iterCnt}: {bestCovers[-1]}: {len(bestCovers[-1])} Total Instructions, {len(bestGraphs[-1])} Unique Instructions.', file=sys.stderr)
-    iterCnt += 1
+    if run:
+      print(f'{len(bestCovers)} Best Covers (with slack) passed to downstream processing.', file=sys.stderr)
+    else:
+      print(f'{len(bestCovers)} Covers passed to downstream processing AFTER ABORTING RECURSION.', file=sys.stderr)
+
+  return header, depG, bestCovers, bestGraphs
 
 
-if cf.debugStdErr:
-  if run:
-    print(f'{len(bestCovers)} Best Covers (with slack) passed to downstream processing.', file=sys.stderr)
+if __name__ == '__main__':
+  argc = len(sys.argv)
+  if argc > 1:
+    f = open(sys.argv[1])
   else:
-    print(f'{len(bestCovers)} Covers passed to downstream processing AFTER ABORTING RECURSION.', file=sys.stderr)
+    f = tempfile.TemporaryFile('w+')
+    f.write(sys.stdin.read())
+    f.seek(0)
+
+  header, depG, isaList = ast.literal_eval(f.read())
+  depG = json_graph.node_link_graph(depG)
+  f.close()
 
-print(repr((header,json_graph.node_link_data(depG),bestCovers,[[json_graph.node_link_data(j) for j in i] for i in bestGraphs])))
+  header, depG, bestCovers, bestGraphs = sets2slack2cover(header,depG,isaList)
+
+  if cf.compactCoverOutput:                                             # Compact output: table of distinct patterns once, per-cover lists of indices into table
+    patternTable = []
+    patternIdx = {}
+    for graphs in bestGraphs:
+      for g in graphs:
+        if id(g) not in patternIdx:
+          patternIdx[id(g)] = len(patternTable)
+          patternTable.append(g)
+    print(repr((header,json_graph.node_link_data(depG),bestCovers,[json_graph.node_link_data(g) for g in patternTable],[[patternIdx[id(g)] for g in graphs] for graphs in bestGraphs])))
+  else:
+    print(repr((header,json_graph.node_link_data(depG),bestCovers,[[json_graph.node_link_data(j) for j in i] for i in bestGraphs])))